@@ -10,25 +10,76 @@ from matplotlib.axes import Subplot
 from matplotlib.colors import Colormap, LinearSegmentedColormap, ListedColormap
 
 from . import _color
+from ._tikzdata import AxisOptions
 from ._util import _common_texification
 
 if TYPE_CHECKING:
     from matplotlib.axes import Axes
-    from matplotlib.colorbar import Colorbar
+    from matplotlib.axis import Axis, Tick
 
     from ._tikzdata import TikzData
 
 
+class GroupplotOptions:
+    """Options of a groupplot environment.
+
+    The options that all subplots have in common are written once for the groupplot instead of
+    for every subplot. As these are only known when all subplots have been processed, this
+    object is put in the content as is, and only converted to a string when writing the code.
+    """
+
+    def __init__(self, group_style: list[str]) -> None:
+        self.group_style = group_style
+        self.subplot_options: list[set[str]] = []
+        self._common_options: set[str] | None = None
+
+    def add_subplot(self, options: set[str]) -> None:
+        self.subplot_options.append(options)
+        self._common_options = None
+
+    @property
+    def common_options(self) -> set[str]:
+        if self._common_options is None:
+            # Options are only moved if there is more than one subplot to share them.
+            self._common_options = (
+                set.intersection(*self.subplot_options) if len(self.subplot_options) > 1 else set()
+            )
+        return self._common_options
+
+    def __str__(self) -> str:
+        group_style = "group style={{{}}}".format(", ".join(self.group_style))
+        if not self.common_options:
+            return f"[{group_style}]"
+        # Put options in a deterministic order to avoid diff churn.
+        return "[\n" + ",\n".join([group_style, *sorted(self.common_options)]) + "\n]"
+
+
+class SubplotOptions:
+    """Options of a subplot in a groupplot, without the options that all subplots share."""
+
+    def __init__(self, groupplot: GroupplotOptions, options: AxisOptions) -> None:
+        self.groupplot = groupplot
+        self.options = set(options)
+        groupplot.add_subplot(self.options)
+
+    def __str__(self) -> str:
+        options = self.options - self.groupplot.common_options
+        if not options:
+            return "\n"
+        return "[\n" + ",\n".join(sorted(options)) + "\n]\n"
+
+
 class MyAxes:
     def __init__(self, data: TikzData, obj: Axes) -> None:
         """Returns the PGFPlots code for an axis environment."""
         self.data = data
         self.obj = obj
-        self.content: list[str] = []
+        self.content: list[str | GroupplotOptions | SubplotOptions] = []
 
         # Are we dealing with an axis that hosts a colorbar? Skip then, those are
         # treated implicitily by the associated axis.
-        self.is_colorbar = _is_colorbar_heuristic(obj)
+        _index_colorbars(data, obj)
+        self.is_colorbar = obj in data.colorbar_axes
         if self.is_colorbar:
             return
 
@@ -40,7 +91,7 @@ class MyAxes:
         if isinstance(obj, Subplot):
             self._subplot()
 
-        data.current_axis_options = set()  # Reset axis options
+        data.current_axis_options = AxisOptions()  # Reset axis options
 
         self._set_hide_axis()
         self._set_plot_title()
@@ -254,7 +305,7 @@ class MyAxes:
             self.data.current_axis_options.add(f"axis background/.style={{fill={col}}}")
 
     def _set_colorbar(self) -> None:
-        colorbar = _find_associated_colorbar(self.obj)
+        colorbar = self.data.axes_colorbars.get(self.obj)
         if not colorbar:
             return
 
@@ -281,8 +332,10 @@ class MyAxes:
             ) * (limits[1] - limits[0]) + limits[0]
             # Getting the labels via get_* might not actually be suitable:
             # they might not reflect the current state.
-            colorbar_ticklabels = colorbar.ax.get_xticklabels()
-            colorbar_ticklabels_minor = colorbar.ax.get_xticklabels(minor=True)
+            colorbar_ticklabels = [label.get_text() for label in colorbar.ax.get_xticklabels()]
+            colorbar_ticklabels_minor = [
+                label.get_text() for label in colorbar.ax.get_xticklabels(minor=True)
+            ]
 
             colorbar_styles.extend(_get_ticks(self.data, "x", colorbar_ticks, colorbar_ticklabels))
             colorbar_styles.extend(
@@ -308,9 +361,11 @@ class MyAxes:
 
             # Getting the labels via get_* might not actually be suitable:
             # they might not reflect the current state.
-            colorbar_ticklabels = colorbar.ax.get_yticklabels()
+            colorbar_ticklabels = [label.get_text() for label in colorbar.ax.get_yticklabels()]
             colorbar_ylabel = colorbar.ax.get_ylabel()
-            colorbar_ticklabels_minor = colorbar.ax.get_yticklabels(minor=True)
+            colorbar_ticklabels_minor = [
+                label.get_text() for label in colorbar.ax.get_yticklabels(minor=True)
+            ]
             colorbar_styles.extend(_get_ticks(self.data, "y", colorbar_ticks, colorbar_ticklabels))
             colorbar_styles.extend(
                 _get_ticks(self.data, "minor y", colorbar_ticks_minor, colorbar_ticklabels_minor)
@@ -322,7 +377,7 @@ class MyAxes:
 
         mycolormap, is_custom_cmap = _mpl_cmap2pgf_cmap(colorbar.mappable.get_cmap(), self.data)
         if is_custom_cmap:
-            self.data.current_axis_options.add("colormap=" + mycolormap)
+            self.data.current_axis_options.add("colormap name=" + mycolormap)
         else:
             self.data.current_axis_options.add("colormap/" + mycolormap)
 
@@ -341,11 +396,15 @@ class MyAxes:
         else:
             self.content.append(self.data.flavor.start("axis"))
 
-    def get_begin_code(self) -> list[str]:
-        if self.data.current_axis_options:
-            # Put axis_options in a deterministic order to avoid diff churn.
+    def get_begin_code(self) -> list[str | GroupplotOptions | SubplotOptions]:
+        if self.is_subplot and self.data.current_groupplot is not None:
+            # The options that all subplots have in common are moved to the groupplot.
             self.content.append(
-                "[\n" + ",\n".join(sorted(self.data.current_axis_options)) + "\n]\n"
+                SubplotOptions(self.data.current_groupplot, self.data.current_axis_options)
+            )
+        elif self.data.current_axis_options:
+            self.content.append(
+                "[\n" + ",\n".join(self.data.current_axis_options.sorted()) + "\n]\n"
             )
         return self.content
 
@@ -359,47 +418,35 @@ class MyAxes:
         return ""
 
     def _get_ticks(self) -> None:
-        self.data.current_axis_options.update(
-            _get_ticks(self.data, "x", self.obj.get_xticks(), self.obj.get_xticklabels())
-        )
-        self.data.current_axis_options.update(
-            _get_ticks(self.data, "y", self.obj.get_yticks(), self.obj.get_yticklabels())
-        )
-        self.data.current_axis_options.update(
-            _get_ticks(
-                self.data,
-                "minor x",
-                self.obj.get_xticks(minor=True),
-                self.obj.get_xticklabels(minor=True),
+        fast = self._use_fast_ticks()
+        for xy, axis in (("x", self.obj.xaxis), ("y", self.obj.yaxis)):
+            ticks, ticklabels = _get_ticks_and_labels(axis, minor=False, fast=fast)
+            self.data.current_axis_options.update(_get_ticks(self.data, xy, ticks, ticklabels))
+        for xy, axis in (("x", self.obj.xaxis), ("y", self.obj.yaxis)):
+            ticks, ticklabels = _get_ticks_and_labels(axis, minor=True, fast=fast)
+            self.data.current_axis_options.update(
+                _get_ticks(self.data, f"minor {xy}", ticks, ticklabels)
             )
-        )
-        self.data.current_axis_options.update(
-            _get_ticks(
-                self.data,
-                "minor y",
-                self.obj.get_yticks(minor=True),
-                self.obj.get_yticklabels(minor=True),
-            )
-        )
 
-    def _get_tick_colors(self) -> None:
-        try:
-            l0 = self.obj.get_xticklines()[0]
-        except IndexError:
-            pass
-        else:
-            c0 = l0.get_color()
-            xtickcolor, _ = _color.mpl_color2xcolor(self.data, c0)
-            self.data.current_axis_options.add(f"xtick style={{color={xtickcolor}}}")
+    def _use_fast_ticks(self) -> bool:
+        """Whether to read tick properties from the axis instead of from all Tick objects.
 
-        try:
-            l0 = self.obj.get_yticklines()[0]
-        except IndexError:
-            pass
-        else:
-            c0 = l0.get_color()
-            ytickcolor, _ = _color.mpl_color2xcolor(self.data, c0)
-            self.data.current_axis_options.add(f"ytick style={{color={ytickcolor}}}")
+        Matplotlib creates and updates a Tick object, with lines and labels, for each tick. In
+        fast mode, tick locations and labels are taken directly from the locators and
+        formatters, and the other properties from the first tick of each axis, from which
+        matplotlib copies the properties of all other ticks.
+        """
+        return self.data.draft or (self.data.fast_ticks and not self.data.strict)
+
+    def _get_tick_colors(self) -> None:
+        for xy, axis in (("x", self.obj.xaxis), ("y", self.obj.yaxis)):
+            if self._use_fast_ticks():
+                ticklines = [axis.majorTicks[0].tick1line] if len(axis.get_majorticklocs()) else []
+            else:
+                ticklines = axis.get_ticklines()
+            if ticklines:
+                tickcolor, _ = _color.mpl_color2xcolor(self.data, ticklines[0].get_color())
+                self.data.current_axis_options.add(f"{xy}tick style={{color={tickcolor}}}")
 
     def _get_tick_direction(self) -> None:
         # For new matplotlib versions, we could replace the direction getter by
@@ -408,8 +455,8 @@ class MyAxes:
         # doesn't seem to be quite accurate. See
         # <https://github.com/matplotlib/matplotlib/issues/5311>.  For now, just take
         # the first tick direction of each of the axes.
-        x_tick_dirs = [tick._tickdir for tick in self.obj.xaxis.get_major_ticks()]  # type: ignore[attr-defined]  # noqa: SLF001
-        y_tick_dirs = [tick._tickdir for tick in self.obj.yaxis.get_major_ticks()]  # type: ignore[attr-defined]  # noqa: SLF001
+        x_tick_dirs = [tick._tickdir for tick in self._get_major_ticks(self.obj.xaxis)]  # type: ignore[attr-defined]  # noqa: SLF001
+        y_tick_dirs = [tick._tickdir for tick in self._get_major_ticks(self.obj.yaxis)]  # type: ignore[attr-defined]  # noqa: SLF001
         if x_tick_dirs or y_tick_dirs:
             if x_tick_dirs and y_tick_dirs:
                 direction = x_tick_dirs[0] if x_tick_dirs[0] == y_tick_dirs[0] else None
@@ -431,6 +478,11 @@ class MyAxes:
                     msg = f"Direction can be 'in', 'out', or 'inout', but is '{direction}'."
                     raise ValueError(msg)
 
+    def _get_major_ticks(self, axis: Axis) -> list[Tick]:
+        if self._use_fast_ticks():
+            return axis.majorTicks[:1] if len(axis.get_majorticklocs()) else []
+        return axis.get_major_ticks()
+
     def _set_tick_rotation(self) -> None:
         x_tick_rotation_and_horizontal_alignment = (
             self._get_label_rotation_and_horizontal_alignment("x")
@@ -445,8 +497,9 @@ class MyAxes:
             self.data.current_axis_options.add(y_tick_rotation_and_horizontal_alignment)
 
     def _set_tick_positions(self) -> None:
-        x_tick_position_string, x_tick_position = _get_tick_position(self.obj, "x")
-        y_tick_position_string, y_tick_position = _get_tick_position(self.obj, "y")
+        fast = self._use_fast_ticks()
+        x_tick_position_string, x_tick_position = _get_tick_position(self.obj, "x", fast=fast)
+        y_tick_position_string, y_tick_position = _get_tick_position(self.obj, "y", fast=fast)
 
         if x_tick_position == y_tick_position and x_tick_position is not None:
             self.data.current_axis_options.add(f"tick pos={x_tick_position}")
@@ -466,7 +519,7 @@ class MyAxes:
         self.nsubplots = geom[0] * geom[1]
         if self.nsubplots > 1:
             # Is this an axis-colorbar pair? No need for groupplot then.
-            is_groupplot = self.nsubplots != 2 or not _find_associated_colorbar(self.obj)  # noqa: PLR2004
+            is_groupplot = self.nsubplots != 2 or not self.data.axes_colorbars.get(self.obj)  # noqa: PLR2004
 
             if is_groupplot:
                 self.is_subplot = True
@@ -475,21 +528,25 @@ class MyAxes:
                 if not self.data.is_in_groupplot_env:
                     group_style = [f"group size={geom[1]} by {geom[0]}"]
                     group_style.extend(self.data.extra_groupstyle_options)
-                    options = ["group style={{{}}}".format(", ".join(group_style))]
-                    self.content.append(
-                        self.data.flavor.start("groupplot") + f"[{', '.join(options)}]"
-                    )
+                    self.data.current_groupplot = GroupplotOptions(group_style)
+                    self.content.append(self.data.flavor.start("groupplot"))
+                    self.content.append(self.data.current_groupplot)
                     self.data.is_in_groupplot_env = True
                     self.data.pgfplots_libs.add("groupplots")
 
     def _get_label_rotation_and_horizontal_alignment(self, x_or_y: str) -> str:
         label_style = ""
 
-        major_tick_labels = (
-            self.obj.xaxis.get_majorticklabels()
-            if x_or_y == "x"
-            else self.obj.yaxis.get_majorticklabels()
-        )
+        axis = self.obj.xaxis if x_or_y == "x" else self.obj.yaxis
+        if self._use_fast_ticks():
+            major_tick_labels = [
+                label
+                for tick in self._get_major_ticks(axis)
+                for label in (tick.label1, tick.label2)
+                if label.get_visible()
+            ]
+        else:
+            major_tick_labels = axis.get_majorticklabels()
 
         if not major_tick_labels:
             return ""
@@ -530,8 +587,13 @@ class MyAxes:
         return label_style
 
 
-def _get_tick_position(obj: Axes, x_or_y: str) -> tuple[str | None, str | None]:
+def _get_tick_position(
+    obj: Axes, x_or_y: str, *, fast: bool = False
+) -> tuple[str | None, str | None]:
     major_ticks = obj.xaxis.majorTicks if x_or_y == "x" else obj.yaxis.majorTicks
+    if fast:
+        # All ticks are copies of the first one.
+        major_ticks = major_ticks[:1]
 
     major_ticks_bottom = [tick.tick1line.get_visible() for tick in major_ticks]
     major_ticks_top = [tick.tick2line.get_visible() for tick in major_ticks]
@@ -561,14 +623,29 @@ def _get_tick_position(obj: Axes, x_or_y: str) -> tuple[str | None, str | None]:
     return position_string, major_ticks_position
 
 
-def _get_ticks(data: TikzData, xy: str, ticks: list | np.ndarray, ticklabels: list) -> list[str]:
+def _get_ticks_and_labels(
+    axis: Axis, *, minor: bool, fast: bool
+) -> tuple[list | np.ndarray, list[str]]:
+    """Returns the tick locations and the texts of the visible tick labels of an axis."""
+    ticks = axis.get_ticklocs(minor=minor)
+    if not fast:
+        return ticks, [label.get_text() for label in axis.get_ticklabels(minor=minor)]
+
+    # Format the labels like matplotlib does when updating the ticks, without creating them.
+    formatter = axis.get_minor_formatter() if minor else axis.get_major_formatter()
+    texts = ["" if text is None else str(text) for text in formatter.format_ticks(list(ticks))]
+    tick = (axis.minorTicks if minor else axis.majorTicks)[0]
+    return ticks, texts * tick.label1.get_visible() + texts * tick.label2.get_visible()
+
+
+def _get_ticks(
+    data: TikzData, xy: str, ticks: list | np.ndarray, ticklabels: list[str]
+) -> list[str]:
     """Gets a {'x','y'}, a number of ticks and ticks labels.
 
     Returns the necessary axis options for the given configuration.
     """
     axis_options = []
-    is_label_required = _is_label_required(ticks, ticklabels)
-    pgfplots_ticklabels = _get_pgfplots_ticklabels(ticklabels)
 
     # if the labels are all missing, then we need to output an empty set of labels
     if len(ticklabels) == 0 and len(ticks) != 0:
@@ -576,6 +653,13 @@ def _get_ticks(data: TikzData, xy: str, ticks: list | np.ndarray, ticklabels: li
         # remove the multiplier too
         axis_options.append(f"scaled {xy} ticks=" + r"manual:{}{\pgfmathparse{#1}}")
 
+    # In draft mode, always leave the ticks to PGFPlots without comparing the labels.
+    if data.draft:
+        return axis_options
+
+    is_label_required = _is_label_required(ticks, ticklabels)
+    pgfplots_ticklabels = _get_pgfplots_ticklabels(ticklabels)
+
     # Leave the ticks to PGFPlots if not in STRICT mode and if there are no explicit
     # labels.
     if data.strict or is_label_required:
@@ -597,18 +681,15 @@ def _get_ticks(data: TikzData, xy: str, ticks: list | np.ndarray, ticklabels: li
     return axis_options
 
 
-def _is_label_required(ticks: list | np.ndarray, ticklabels: list) -> bool:
+_LOG_TICKLABEL_PATTERN = re.compile(r"\$\\mathdefault\{(\d+)\^\{(-?\d+(?:\.\d+)?)\}\}\$")
+
+
+def _is_label_required(ticks: list | np.ndarray, ticklabels: list[str]) -> bool:
     """Check if the label is necessary.
 
     If one of the labels is, then all of them must appear in the TikZ plot.
     """
-    for tick, ticklabel in zip(ticks, ticklabels, strict=False):
-        # store the label anyway
-        label = ticklabel.get_text()
-
-        if not ticklabel.get_visible():
-            return True
-
+    for tick, label in zip(ticks, ticklabels, strict=False):
         if not label:
             continue
 
@@ -616,7 +697,7 @@ def _is_label_required(ticks: list | np.ndarray, ticklabels: list) -> bool:
             label_float = float(label.replace("\N{MINUS SIGN}", "-"))
         except ValueError:
             # Check if label is in format "$\matchdefault{<base>^{<exponent>}}$" (for log plots)
-            match = re.search(r"\$\\mathdefault\{(\d+)\^\{(-?\d+(?:\.\d+)?)\}\}\$", label)
+            match = _LOG_TICKLABEL_PATTERN.search(label)
             if match is None:
                 return True
             label_float = float(match.group(1)) ** float(match.group(2))
@@ -625,14 +706,10 @@ def _is_label_required(ticks: list | np.ndarray, ticklabels: list) -> bool:
     return False
 
 
-def _get_pgfplots_ticklabels(ticklabels: list) -> list[str]:
-    pgfplots_ticklabels = []
-    for ticklabel in ticklabels:
-        label = ticklabel.get_text()
-        if "," in label:
-            label = "{" + label + "}"
-        pgfplots_ticklabels.append(_common_texification(label))
-    return pgfplots_ticklabels
+def _get_pgfplots_ticklabels(ticklabels: list[str]) -> list[str]:
+    return [
+        _common_texification("{" + label + "}" if "," in label else label) for label in ticklabels
+    ]
 
 
 def _is_colorbar_heuristic(obj: Axes) -> bool:
@@ -667,13 +744,36 @@ def _is_colorbar_heuristic(obj: Axes) -> bool:
 
 
 def _mpl_cmap2pgf_cmap(cmap: Colormap, data: TikzData) -> tuple[str, bool]:
-    """Converts a color map as given in matplotlib to a color map as represented in PGFPlots."""
+    """Converts a color map as given in matplotlib to a color map as represented in PGFPlots.
+
+    Returns the name of the PGFPlots color map and whether it is a custom color map. Custom
+    color maps are defined once per figure, see data.custom_colormaps, and conversions are
+    cached, such that color maps that are shared by many plots are converted only once.
+    """
+    for cached_cmap, converted in data.colormaps.get(cmap.name, []):
+        if cached_cmap is cmap or cached_cmap == cmap:
+            return converted
+
     if isinstance(cmap, LinearSegmentedColormap):
-        return _handle_linear_segmented_color_map(cmap, data)
-    if isinstance(cmap, ListedColormap):
-        return _handle_listed_color_map(cmap, data)
-    msg = "Only LinearSegmentedColormap and ListedColormap are supported."
-    raise NotImplementedError(msg)
+        colormap, is_custom_colormap = _handle_linear_segmented_color_map(cmap, data)
+    elif isinstance(cmap, ListedColormap):
+        colormap, is_custom_colormap = _handle_listed_color_map(cmap, data)
+    else:
+        msg = "Only LinearSegmentedColormap and ListedColormap are supported."
+        raise NotImplementedError(msg)
+
+    if is_custom_colormap:
+        name = "mpl-" + (re.sub(r"[^A-Za-z0-9]+", "-", cmap.name).strip("-") or "cmap")
+        unique_name = name
+        k = 1
+        while unique_name in data.custom_colormaps:
+            unique_name = f"{name}-{k}"
+            k += 1
+        data.custom_colormaps[unique_name] = colormap
+        colormap = unique_name
+
+    data.colormaps.setdefault(cmap.name, []).append((cmap, (colormap, is_custom_colormap)))
+    return colormap, is_custom_colormap
 
 
 def _handle_linear_segmented_color_map(
@@ -682,6 +782,9 @@ def _handle_linear_segmented_color_map(
     if cmap.is_gray():
         is_custom_colormap = False
         return "blackwhite", is_custom_colormap
+    if data.colormap_tolerance is not None:
+        is_custom_colormap = True
+        return _compress_colormap(cmap, data.colormap_tolerance, data), is_custom_colormap
 
     # For an explanation of what _segmentdata contains, see
     # http://matplotlib.org/mpl_examples/pylab_examples/custom_cmap.py
@@ -766,7 +869,7 @@ def _handle_linear_segmented_color_map(
             f"rgb({x}{unit})=({colors[k][0]:{ff}},{colors[k][1]:{ff}},{colors[k][2]:{ff}})"
         )
 
-    colormap_string = "{{mymap}}{{[1{}]\n  {}\n}}".format(unit, ";\n  ".join(color_changes))
+    colormap_string = "{{[1{}]\n  {}\n}}".format(unit, ";\n  ".join(color_changes))
     is_custom_colormap = True
     return colormap_string, is_custom_colormap
 
@@ -793,6 +896,10 @@ def _handle_listed_color_map(cmap: ListedColormap, data: TikzData) -> tuple[str,
             is_custom_colormap = False
             return pgf_cm, is_custom_colormap
 
+    if data.colormap_tolerance is not None:
+        is_custom_colormap = True
+        return _compress_colormap(cmap, data.colormap_tolerance, data), is_custom_colormap
+
     unit = "pt"
     ff = data.float_format
     if cmap.N is None or (
@@ -812,11 +919,59 @@ def _handle_listed_color_map(cmap: ListedColormap, data: TikzData) -> tuple[str,
             f"rgb({k}{unit})=({rgb[0]:{ff}},{rgb[1]:{ff}},{rgb[2]:{ff}})"
             for k, rgb in enumerate(repeated_cols[: cmap.N])
         ]
-    colormap_string = "{{mymap}}{{[1{}]\n {}\n}}".format(unit, ";\n  ".join(colors))
+    colormap_string = "{{[1{}]\n  {}\n}}".format(unit, ";\n  ".join(colors))
     is_custom_colormap = True
     return colormap_string, is_custom_colormap
 
 
+def _compress_colormap(cmap: Colormap, tolerance: float, data: TikzData) -> str:
+    """Returns a PGFPlots color map with as few control points as possible.
+
+    The color map is sampled at its N colors, like matplotlib does, and approximated by
+    piecewise-linear interpolation between as few of these samples as possible, such that no
+    color component deviates more than the tolerance from the matplotlib color map.
+    """
+    colors = cmap(np.linspace(0.0, 1.0, cmap.N))[:, :3]
+    unit = "pt"
+    ff = data.float_format
+    color_changes = [
+        f"rgb({k}{unit})=({colors[k, 0]:{ff}},{colors[k, 1]:{ff}},{colors[k, 2]:{ff}})"
+        for k in _fewest_control_points(colors, tolerance)
+    ]
+    return "{{[1{}]\n  {}\n}}".format(unit, ";\n  ".join(color_changes))
+
+
+def _fewest_control_points(values: np.ndarray, tolerance: float) -> list[int]:
+    """Returns the fewest indices such that interpolating between them approximates the values.
+
+    Between two successive indices, the linear interpolation deviates at most the tolerance
+    from each of the (equidistant) values. The first and last index are always included.
+    """
+    n = len(values)
+    # Minimum number of segments needed to reach each index, and the index it is reached from.
+    cost = np.full(n, n)
+    cost[0] = 0
+    predecessor = np.zeros(n, dtype=int)
+    for i in range(n - 1):
+        steps = np.arange(1, n - i)[:, None]
+        slopes = (values[i + 1 :] - values[i]) / steps
+        # A segment from i to an end fits if its slope stays within the slope bounds that
+        # the values between i and the end impose, in each of the components.
+        lower = np.maximum.accumulate(slopes - tolerance / steps, axis=0)
+        upper = np.minimum.accumulate(slopes + tolerance / steps, axis=0)
+        fits = np.ones(n - i - 1, dtype=bool)
+        fits[1:] = np.all((lower[:-1] <= slopes[1:]) & (slopes[1:] <= upper[:-1]), axis=1)
+        ends = np.arange(i + 1, n)
+        improves = fits & (cost[i] + 1 < cost[ends])
+        cost[ends[improves]] = cost[i] + 1
+        predecessor[ends[improves]] = i
+
+    indices = [n - 1]
+    while indices[-1] > 0:
+        indices.append(int(predecessor[indices[-1]]))
+    return indices[::-1]
+
+
 def _scale_to_int(array: np.ndarray, max_val: float) -> list[int]:
     """Scales the array X such that it contains only integers."""
     array = array / max(1 / max_val, _gcd_array(array))
@@ -824,28 +979,27 @@ def _scale_to_int(array: np.ndarray, max_val: float) -> list[int]:
 
 
 def _gcd_array(array: np.ndarray) -> float:
-    """Return the largest real value h such that all elements in x are integer multiples of h."""
-    greatest_common_divisor = 0.0
-    for x in array:
-        greatest_common_divisor = _gcd(greatest_common_divisor, x)
-
-    return greatest_common_divisor
+    """Return the largest real value h such that all elements in x are integer multiples of h.
 
-
-def _gcd(a: float, b: float) -> float:
-    """Euclidean algorithm for calculating the GCD of two numbers a, b.
-
-    This algorithm also works for real numbers:
-    Find the greatest number h such that a and b are integer multiples of h.
+    This is the Euclidean algorithm, applied to all elements at once: all elements are replaced
+    by their remainder of the division by the smallest element, until only that one is left.
     """
     # Keep the tolerance somewhat significantly above machine precision as otherwise
     # round-off errors will be accounted for, returning 1.0e-10 instead of 1.0 for the
     # values
     #   [1.0, 2.0000000001, 3.0, 4.0].
     tolerance = 1e-5
-    while a > tolerance:
-        a, b = b % a, a
-    return b
+    values = np.abs(np.asarray(array, dtype=float))
+    values = values[values > tolerance]
+    if len(values) == 0:
+        return 0.0
+    while True:
+        smallest = values.min()
+        remainders = values % smallest
+        remainders = remainders[remainders > tolerance]
+        if len(remainders) == 0:
+            return float(smallest)
+        values = np.append(remainders, smallest)
 
 
 def _linear_interpolation(x: float, a: tuple[float, float], b: tuple[float, float]) -> float:
@@ -853,23 +1007,38 @@ def _linear_interpolation(x: float, a: tuple[float, float], b: tuple[float, floa
     return (b[1] * (x - a[0]) + b[0] * (a[1] - x)) / (a[1] - a[0])
 
 
-def _find_associated_colorbar(obj: Axes) -> Colorbar | None:
-    """Find associated colorbar, if any.
+def _index_colorbars(data: TikzData, obj: Axes) -> None:
+    """Indexes the colorbars of all axes of the figure of obj, unless already done.
 
-    A rather poor way of telling whether an axis has a colorbar associated: Check the
-    next axis environment, and see if it is de facto a color bar; if yes, return the
-    color bar object.
+    Afterwards, data.axes_colorbars maps each of these axes to its associated colorbar, if any,
+    and data.colorbar_axes contains the axes that are de facto a colorbar.
     """
-    for child in obj.get_children():
-        try:
-            cbar = child.colorbar  # type: ignore[attr-defined]
-        except AttributeError:
+    if obj in data.axes_colorbars:
+        return
+    figure = obj.get_figure()
+    all_axes = figure.get_axes() if figure is not None else []
+    if obj not in all_axes:
+        all_axes.append(obj)
+    for ax in all_axes:
+        data.axes_colorbars.setdefault(ax, None)
+        if _is_colorbar_heuristic(ax):
+            data.colorbar_axes.add(ax)
+
+    for ax in all_axes:
+        # Matplotlib stores the colorbar in its axes, and in its mappable, which is usually
+        # drawn in the axes that the colorbar is associated with.
+        colorbar = getattr(ax, "_colorbar", None)
+        if colorbar is None:
             continue
-        if cbar is not None:  # really necessary?
-            # if fetch was successful, cbar contains
-            # (reference to colorbar, reference to axis containing colorbar)
-            return cbar
-    return None
+        mappable = colorbar.mappable
+        mappable_axes = getattr(mappable, "axes", None)
+        if (
+            mappable_axes is not None
+            and mappable_axes in data.axes_colorbars
+            and getattr(mappable, "colorbar", None) is colorbar
+            and data.axes_colorbars[mappable_axes] is None
+        ):
+            data.axes_colorbars[mappable_axes] = colorbar
 
 
 def _try_f2i(x: float) -> float:
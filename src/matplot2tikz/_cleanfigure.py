@@ -1,26 +1,50 @@
 from __future__ import annotations
 
+import math
 import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
+from functools import partial
 from typing import TYPE_CHECKING
 
-import matplotlib as mpl
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.axes import Axes
-from matplotlib.collections import PathCollection
+from matplotlib.collections import Collection, LineCollection, PathCollection, PolyCollection
 from matplotlib.container import BarContainer
 from matplotlib.contour import QuadContourSet
 from matplotlib.figure import Figure
 from matplotlib.lines import Line2D
+from matplotlib.path import Path
 from mpl_toolkits.mplot3d import Axes3D, art3d
 
+from ._util import get_fill_between_boundaries, is_fill_between
+
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from concurrent.futures import Executor
+
     from matplotlib.artist import Artist
     from matplotlib.figure import FigureBase
 
+    # Applies the reduced data of an artist to the artist or to the overlay
+    _Update = Callable[[], None]
+    # Computes the reduced data of an artist, without modifying the artist
+    _Job = Callable[[], _Update | None]
+
 
 STEP_DRAW_STYLES = ["steps-pre", "steps-post", "steps-mid"]
+# Size of the first block of vertices that is processed at once by the Opheim algorithm
+_OPHEIM_BLOCK_SIZE = 16
+# Number of vertices that the Opheim algorithm checks one by one before processing blocks
+_OPHEIM_SCALAR_CHECKS = 2
+# Minimal number of vertices of a path that is simplified in the process pool of clean_figure
+_OPHEIM_PROCESS_SIZE = 2**14
+# Maximal number of cells of the pixel grid for which _pixelate uses a lookup table
+_PIXELATE_TABLE_SIZE = 2**24
+# Number of points of a line that are cleaned at once. Longer lines are streamed window by window
+_STREAM_CHUNK_SIZE = 2**20
 
 
 def initial_data() -> np.ndarray:
@@ -31,6 +55,34 @@ def initial_axis_limits() -> np.ndarray:
     return np.array([-np.inf, np.inf])
 
 
+@dataclass
+class CleanFigureOverlay:
+    """Reduced data of the artists of a figure, as computed by ``clean_figure(inplace=False)``.
+
+    Pass the overlay to ``get_tikz_code`` to export the reduced data instead of the data of the
+    artists, which is left untouched.
+    """
+
+    # Data of lines, with shape [N, 2] or, for 3D lines, [N, 3]
+    lines: dict[Line2D | art3d.Line3D, np.ndarray] = field(default_factory=dict)
+    # Offsets of scatter plots, with shape [N, 2]
+    offsets: dict[PathCollection | art3d.Path3DCollection, np.ndarray] = field(default_factory=dict)
+    # Paths of other collections
+    paths: dict[Collection, list[Path]] = field(default_factory=dict)
+
+    def __getitem__(self, artist: Artist) -> np.ndarray | list[Path]:
+        for reduced in (self.lines, self.offsets, self.paths):
+            if artist in reduced:
+                return reduced[artist]  # type: ignore[index]
+        raise KeyError(artist)
+
+    def __contains__(self, artist: Artist) -> bool:
+        return any(artist in reduced for reduced in (self.lines, self.offsets, self.paths))
+
+    def __len__(self) -> int:
+        return len(self.lines) + len(self.offsets) + len(self.paths)
+
+
 @dataclass
 class CleanFigureData:
     fig: FigureBase
@@ -43,19 +95,25 @@ class CleanFigureData:
     y_lim: np.ndarray = field(default_factory=initial_axis_limits)
     has_lines: bool | None = None
     has_markers: bool | None = None
+    # Process pool in which long lines are simplified, if any
+    pool: Executor | None = None
 
 
 def clean_figure(
     fig: FigureBase | None = None,
     target_resolution: int | list[int] | np.ndarray = 600,
     scale_precision: float = 1.0,
-) -> None:
+    *,
+    inplace: bool = True,
+    workers: int = 1,
+) -> CleanFigureOverlay | None:
     r"""Cleans figure as a preparation for tikz export.
 
     This will minimize the number of points required for the tikz figure.
     If the figure has subplots, it will recursively clean then up.
 
-    Note that this function modifies the figure directly (impure function).
+    Note that this function modifies the figure directly (impure function), unless
+    ``inplace=False``.
 
     :param fig: Matplotlib figure handle (Default value = None)
     :param target_resolution: target resolution of final figure in PPI.
@@ -65,6 +123,15 @@ def clean_figure(
                               By default 600
     :param scale_precision: scalar value indicating precision when scaling down.
                            By default 1
+    :param inplace: Whether to replace the data of the artists. If ``False``, the figure is left
+                    untouched and the reduced data is returned as an overlay, which can be passed
+                    to ``get_tikz_code(overlay=...)``. By default True
+    :param workers: number of threads that compute the reduced data of the artists in parallel.
+                    Long lines are simplified in a pool of as many processes. The artists are
+                    updated afterwards, one after another. If the processes are not forked,
+                    the calling script needs an ``if __name__ == "__main__":`` guard, see
+                    :mod:`multiprocessing`. By default 1
+    :returns: The overlay with the reduced data if ``inplace=False``, otherwise ``None``.
 
     Examples:
     --------
@@ -123,49 +190,163 @@ def clean_figure(
                 assert num_lines_raw - num_lines_clean == 14
         ```
     """
+    if workers < 1:
+        msg = f"The number of workers must be at least 1, not {workers}."
+        raise ValueError(msg)
     if fig is None or fig == "gcf":
         fig = plt.gcf()
-    _recursive_cleanfigure(
-        fig, target_resolution=target_resolution, scale_precision=scale_precision
-    )
+    overlay = None if inplace else CleanFigureOverlay()
+    with _simplification_pool(workers) as pool:
+        jobs = _recursive_cleanfigure(
+            fig,
+            target_resolution=target_resolution,
+            scale_precision=scale_precision,
+            overlay=overlay,
+            pool=pool,
+        )
+        # The artists are only modified after all reduced data is computed, so that the jobs do
+        # not need to synchronize.
+        for update in _run_jobs(jobs, workers):
+            if update is not None:
+                update()
+    return overlay
+
+
+@contextmanager
+def _simplification_pool(workers: int) -> Iterator[Executor | None]:
+    """Process pool in which long lines are simplified, if there is more than one worker.
+
+    The Opheim simplification loops over the keys in Python. It holds the GIL, so it does not run
+    in parallel on the threads of _run_jobs.
+    """
+    if workers == 1:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Forked processes are all started at the first submission. Start them now, as forking is
+        # not safe once the threads of _run_jobs are running.
+        pool.submit(int).result()
+        yield pool
+
+
+def _run_jobs(jobs: list[_Job], workers: int) -> list[_Update | None]:
+    """Run the jobs, on a thread pool if there is more than one worker.
+
+    Most of the work is done by NumPy, which releases the GIL, so threads can run in parallel.
+    Long lines are simplified in the process pool of _simplification_pool instead. The jobs only
+    read the data of their artist and state of the axes that is up to date, see
+    _collect_axes_jobs, such that they do not need to synchronize.
+    """
+    if workers == 1 or len(jobs) <= 1:
+        return [job() for job in jobs]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda job: job(), jobs))
 
 
 def _recursive_cleanfigure(
-    obj: Artist, target_resolution: int | list[int] | np.ndarray, scale_precision: float
-) -> None:
-    """Recursively visit child objects and clean them.
+    obj: Artist,
+    target_resolution: int | list[int] | np.ndarray,
+    scale_precision: float,
+    overlay: CleanFigureOverlay | None,
+    pool: Executor | None,
+) -> list[_Job]:
+    """Recursively visit child objects and collect the jobs that clean them.
 
     :param obj: object
     :param target_resolution: target resolution of final figure in PPI.
         If a scalar integer is provided, it is assumed to be square in both axis.
         If a list or an np.array is provided, it is interpreted as [H, W].
     :param scale_precision: scalar value indicating precision when scaling down.
+    :param overlay: overlay in which the reduced data is stored, or ``None`` to replace the
+        data of the artists.
+    :param pool: process pool in which long lines are simplified, or ``None``.
     """
+    jobs: list[_Job] = []
     for child in obj.get_children():
-        if isinstance(child, Axes):
+        if isinstance(child, (Axes, Axes3D)):
             # Note: containers contain Patches but are not child objects.
             # This is a problem because a bar plot creates a Barcontainer.
             _clean_containers(child)
-            _recursive_cleanfigure(child, target_resolution, scale_precision)
-        elif isinstance(child, Axes3D):
-            _clean_containers(child)
-            _recursive_cleanfigure(child, target_resolution, scale_precision)
-        elif isinstance(child, (Line2D, art3d.Line3D)):
-            _cleanline(child, target_resolution, scale_precision)
+            jobs.extend(
+                _collect_axes_jobs(child, target_resolution, scale_precision, overlay, pool)
+            )
+    return jobs
+
+
+def _collect_axes_jobs(
+    axes: Axes,
+    target_resolution: int | list[int] | np.ndarray,
+    scale_precision: float,
+    overlay: CleanFigureOverlay | None,
+    pool: Executor | None,
+) -> list[_Job]:
+    """Collect the jobs that clean the artists of the axes.
+
+    The limits of the axes, and whether an artist is given in data coordinates, are determined
+    here, before the jobs run. Matplotlib updates the view limits and transforms lazily, which is
+    not safe to do from several threads at once.
+    """
+    limits = _get_visual_limits(axes)
+    # Inset axes are children of the axes
+    jobs = _recursive_cleanfigure(axes, target_resolution, scale_precision, overlay, pool)
+    for child in axes.get_children():
+        if isinstance(child, (Line2D, art3d.Line3D)):
+            jobs.append(
+                partial(
+                    _cleanline, child, limits, target_resolution, scale_precision, overlay, pool
+                )
+            )
         elif isinstance(child, (PathCollection, art3d.Path3DCollection)):
-            _clean_collections(child, target_resolution, scale_precision)
-        elif isinstance(child, mpl.collections.LineCollection):
-            warnings.warn(
-                "Cleaning Line Collections (scatter plot) is not supported yet.", stacklevel=2
+            jobs.append(
+                partial(
+                    _clean_collections, child, limits, target_resolution, scale_precision, overlay
+                )
+            )
+        elif isinstance(child, PolyCollection) and is_fill_between(child):
+            jobs.append(
+                partial(_clean_fill_between, child, limits, target_resolution, overlay, pool)
+            )
+        elif isinstance(child, art3d.Line3DCollection) or (
+            # E.g., the dividers of a colorbar are not given in data coordinates
+            isinstance(child, LineCollection) and _is_in_data_coordinates(child, axes)
+        ):
+            jobs.append(
+                partial(
+                    _clean_line_collection,
+                    child,
+                    limits,
+                    target_resolution,
+                    scale_precision,
+                    overlay,
+                    pool,
+                )
             )
-        elif isinstance(child, art3d.Line3DCollection):
-            warnings.warn("Cleaning Line3DCollection is not supported yet.", stacklevel=2)
         elif isinstance(child, art3d.Poly3DCollection):
-            warnings.warn("Cleaning Poly3DCollections is not supported yet.", stacklevel=2)
+            jobs.append(
+                partial(_clean_poly3d_collection, child, limits, target_resolution, overlay)
+            )
         elif isinstance(child, QuadContourSet):
-            warnings.warn("Cleaning QuadContourSet is not supported yet.", stacklevel=2)
+            if isinstance(axes, Axes3D):
+                warnings.warn("Cleaning 3D contour sets is not supported yet.", stacklevel=2)
+            elif _is_in_data_coordinates(child, axes):
+                jobs.append(
+                    partial(
+                        _clean_contour_set,
+                        child,
+                        limits,
+                        target_resolution,
+                        scale_precision,
+                        overlay,
+                        pool,
+                    )
+                )
         # The following objects are passed:
         # Spine, AxesImage, Patch
+    return jobs
+
+
+def _is_in_data_coordinates(artist: Artist, axes: Axes) -> bool:
+    return artist.get_transform() == axes.transData
 
 
 def _clean_containers(axes: Axes) -> None:
@@ -175,58 +356,300 @@ def _clean_containers(axes: Axes) -> None:
             warnings.warn("Cleaning Bar Container (bar plot) is not supported yet.", stacklevel=2)
 
 
-def _cleanline(
+def _cleanline(  # noqa: PLR0913
     linehandle: Line2D | art3d.Line3D,
+    limits: tuple[np.ndarray, np.ndarray],
     target_resolution: int | list[int] | np.ndarray,
     scale_precision: float,
-) -> None:
+    overlay: CleanFigureOverlay | None,
+    pool: Executor | None,
+) -> _Update | None:
     """Clean a 2D or 3D Line plot figure."""
     axes = linehandle.axes
     if axes is None:
-        return
+        return None
     figure = axes.figure
     if figure is None:
-        return
+        return None
     cfd = CleanFigureData(
         fig=figure,
         axes=axes,
         target_resolution=target_resolution,
         scale_precision=scale_precision,
+        pool=pool,
     )
 
-    if _is_step(linehandle):
-        warnings.warn("step plot simplification not yet implemented.", stacklevel=2)
+    cfd.x_lim, cfd.y_lim = limits
+    if _is_step(linehandle) and linehandle.get_marker() != "None":
+        warnings.warn("Simplification of step plots with markers is not supported.", stacklevel=2)
+        return None
+    if _is_streamed(linehandle):
+        data = _stream_line(cfd, linehandle)
+    elif _is_step(linehandle):
+        cfd.data = _get_line_data(linehandle)
+        cfd.visual_data = _get_visual_data(cfd.axes, cfd.data)
+        data = _simplify_step_line(cfd, linehandle.get_drawstyle())
     else:
         cfd.data = _get_line_data(linehandle)
-        cfd.x_lim, cfd.y_lim = _get_visual_limits(cfd.axes)
         cfd.visual_data = _get_visual_data(cfd.axes, cfd.data)
         cfd.has_lines = _line_has_lines(linehandle)
 
         cfd.data = _prune_outside_box(cfd)
         cfd.visual_data = _get_visual_data(cfd.axes, cfd.data)
 
-        if not isinstance(linehandle, art3d.Line3D):
-            cfd.visual_data = _move_points_closer(cfd.x_lim, cfd.y_lim, cfd.visual_data)
-
         cfd.has_markers = linehandle.get_marker() != "None"
         cfd.has_lines = linehandle.get_linestyle() != "None"
+        if not isinstance(linehandle, art3d.Line3D):
+            cfd.data = _move_points_closer(cfd)
+            cfd.visual_data = _get_visual_data(cfd.axes, cfd.data)
+
         data = _simplify_line(cfd)
-        data = _limit_precision(cfd.axes, data, cfd.scale_precision)
+    data = _limit_precision(cfd.axes, data, cfd.scale_precision)
+    return partial(_update_line, linehandle, data, overlay)
+
+
+def _update_line(
+    linehandle: Line2D | art3d.Line3D, data: np.ndarray, overlay: CleanFigureOverlay | None
+) -> None:
+    if overlay is None:
         _update_line_data(linehandle, data)
+    else:
+        overlay.lines[linehandle] = data
+
+
+def _is_streamed(linehandle: Line2D | art3d.Line3D) -> bool:
+    """Whether the line is long enough to be cleaned window by window.
+
+    Step plots and 3D lines are always cleaned at once.
+    """
+    return (
+        not isinstance(linehandle, art3d.Line3D)
+        and not _is_step(linehandle)
+        and np.size(linehandle.get_xdata()) > _STREAM_CHUNK_SIZE
+    )
+
+
+def _stream_line(cfd: CleanFigureData, linehandle: Line2D) -> np.ndarray:
+    """Clean a long 2D line in windows of _STREAM_CHUNK_SIZE points.
+
+    The windows are streamed through the same steps as lines that are cleaned at once, i.e.,
+    pruning, moving points closer and simplification, with the state at the edges of the windows
+    carried over from one window to the next. Thereby, only the reduced data is ever held in
+    memory for the whole line.
+    """
+    chunks = _stream_prune_outside_box(
+        cfd,
+        np.asarray(linehandle.get_xdata()),
+        np.asarray(linehandle.get_ydata()),
+        has_lines=_line_has_lines(linehandle),
+    )
+    has_lines = linehandle.get_linestyle() != "None"
+    has_markers = linehandle.get_marker() != "None"
+    chunks = _stream_move_points_closer(cfd, chunks, has_lines=has_lines)
+    chunks = _stream_simplify(cfd, chunks, has_lines=has_lines, has_markers=has_markers)
+    return np.concatenate([np.empty((0, 2), dtype=np.float32), *chunks])
+
+
+@dataclass
+class _GapState:
+    """State of _keep_with_gaps, carried over from one window of a line to the next."""
+
+    # Whether a point was kept before
+    started: bool = False
+    # Whether the last point of the previous window was kept
+    last_kept: bool = True
+
+
+def _keep_with_gaps(data: np.ndarray, keep: np.ndarray, state: _GapState) -> np.ndarray:
+    """Keep the rows of data in keep, and replace every run of other rows by a single NaN.
+
+    Like _remove_nans, there are no NaNs in front of the first or behind the last kept row of the
+    whole line.
+    """
+    id_keep = np.flatnonzero(keep)
+    follows_gap = np.logical_not(np.concatenate([[state.last_kept], keep[:-1]]))[id_keep]
+    if not state.started and not _isempty(follows_gap):
+        follows_gap[0] = False
+    if len(keep):
+        state.last_kept = bool(keep[-1])
+    state.started = state.started or not _isempty(id_keep)
+    return np.insert(data[id_keep], np.flatnonzero(follows_gap), np.nan, axis=0)
+
+
+def _stream_prune_outside_box(
+    cfd: CleanFigureData, x_data: np.ndarray, y_data: np.ndarray, *, has_lines: bool
+) -> Iterator[np.ndarray]:
+    """Windowed version of _prune_outside_box."""
+    tol = 1.0e-10
+    relaxed_x_lim = cfd.x_lim + np.array([-tol, tol])
+    relaxed_y_lim = cfd.y_lim + np.array([-tol, tol])
+
+    n = np.size(x_data)
+    state = _GapState()
+    for start in range(0, n, _STREAM_CHUNK_SIZE):
+        stop = min(start + _STREAM_CHUNK_SIZE, n)
+        # Include the neighbouring points, such that the segments to them are checked as well
+        lower, upper = max(start - 1, 0), min(stop + 1, n)
+        data = _stack_data_2d(
+            np.asarray(x_data[lower:upper]).astype(np.float32),
+            np.asarray(y_data[lower:upper]).astype(np.float32),
+        )
+        visual_data = _get_visual_data(cfd.axes, data)
+        data_is_in_box = _is_in_box(visual_data, relaxed_x_lim, relaxed_y_lim)
+
+        window = slice(start - lower, stop - lower)
+        should_plot = data_is_in_box[window]
+        if has_lines:
+            segvis = np.concatenate(
+                [
+                    np.zeros(int(lower == start), dtype=bool),
+                    _segment_visible(visual_data, data_is_in_box, cfd.x_lim, cfd.y_lim),
+                    np.zeros(int(upper == stop), dtype=bool),
+                ]
+            )
+            should_plot = should_plot | segvis[:-1] | segvis[1:]
+        yield _keep_with_gaps(data[window], should_plot, state)
+
+
+def _stream_move_points_closer(
+    cfd: CleanFigureData, chunks: Iterator[np.ndarray], *, has_lines: bool
+) -> Iterator[np.ndarray]:
+    """Windowed version of _move_points_closer."""
+    large_xlim, large_ylim = _get_large_limits(cfd)
+    state = _GapState()
+    # Last point of the previous window, for the segment to the first point of this window
+    previous = np.empty((0, 2), dtype=np.float32)
+    for chunk in chunks:
+        if _isempty(chunk):
+            continue
+        is_outside = _is_outside_large_box(
+            _get_visual_data(cfd.axes, chunk), large_xlim, large_ylim
+        )
+        if not has_lines:
+            yield chunk[np.logical_not(is_outside)]
+            continue
+
+        extended = np.concatenate([previous, chunk])
+        extended_visual = _get_visual_data(cfd.axes, extended)
+        id_insert, visual_insert = _cut_off_segments(
+            extended_visual,
+            _is_outside_large_box(extended_visual, large_xlim, large_ylim),
+            large_xlim,
+            large_ylim,
+        )
+        data = np.array(chunk, copy=True)
+        data[is_outside] = np.nan
+        data = _insert_data(
+            data,
+            id_insert - len(previous),
+            _get_data_from_visual(cfd.axes, visual_insert),
+        )
+        previous = chunk[-1:]
+        yield _keep_with_gaps(data, np.logical_not(np.any(np.isnan(data), axis=1)), state)
+
+
+def _stream_simplify(
+    cfd: CleanFigureData, chunks: Iterator[np.ndarray], *, has_lines: bool, has_markers: bool
+) -> Iterator[np.ndarray]:
+    """Windowed version of _simplify_line."""
+    if _is_simplification_disabled(cfd.target_resolution) or has_lines == has_markers:
+        return chunks
+    x_to_pix, y_to_pix = _get_pixel_scale(cfd)
+    if has_markers:
+        return _stream_pixelate(cfd.axes, chunks, x_to_pix, y_to_pix)
+    return _stream_opheim_simplify(cfd.axes, chunks, min(1 / x_to_pix, 1 / y_to_pix), cfd.pool)
+
+
+def _stream_pixelate(
+    axhandle: Axes, chunks: Iterator[np.ndarray], x_to_pix: float, y_to_pix: float
+) -> Iterator[np.ndarray]:
+    """Windowed version of _pixelate, which keeps the first point of each cell of the line."""
+    mult = 2
+    # Cells of the pixel grid that are occupied in the previous windows, as x + iy
+    occupied = np.empty(0, dtype=complex)
+    # The last point of the line is always kept, so hold back the last point of each window
+    last = np.empty((0, 2), dtype=np.float32)
+    for chunk in chunks:
+        data = np.concatenate([last, chunk])
+        data, last = data[:-1], data[-1:]
+        x, y = _split_data_2d(_get_visual_data(axhandle, data))
+        is_finite = np.logical_and(np.isfinite(x), np.isfinite(y))
+        id_finite = np.flatnonzero(is_finite)
+
+        mask = np.logical_not(is_finite)
+        if not _isempty(id_finite):
+            x_pixel = np.round(x[id_finite] * x_to_pix * mult)
+            y_pixel = np.round(y[id_finite] * y_to_pix * mult)
+            first = _one_per_cell(x_pixel - np.min(x_pixel), y_pixel - np.min(y_pixel))
+            cell = x_pixel[first] + 1j * y_pixel[first]
+            is_new = np.logical_not(np.isin(cell, occupied))
+            occupied = np.union1d(occupied, cell[is_new])
+            mask[id_finite[first[is_new]]] = True
+        yield data[mask]
+    yield last
+
+
+def _stream_opheim_simplify(
+    axhandle: Axes, chunks: Iterator[np.ndarray], tol: float, pool: Executor | None
+) -> Iterator[np.ndarray]:
+    """Windowed version of the line simplification of _simplify_line.
+
+    The part of the current line from its last key on is carried over to the next window. If it
+    grows beyond a few windows, e.g., for a straight line, its last point is made a key.
+    """
+    carry = np.empty((0, 2), dtype=np.float32)
+    for data in chunks:
+        x_data_vis, y_data_vis = _split_data_2d(_get_visual_data(axhandle, data))
+        id_nan = np.flatnonzero(np.logical_or(np.isnan(x_data_vis), np.isnan(y_data_vis)))
+        start = 0
+        # Lines which are separated by NaNs are simplified separately
+        for stop in id_nan.tolist():
+            yield from _opheim_simplify_part(
+                axhandle, np.concatenate([carry, data[start:stop]]), tol, pool, final=True
+            )
+            yield data[stop : stop + 1]
+            carry = data[:0]
+            start = stop + 1
+        kept, carry = _opheim_simplify_part(
+            axhandle,
+            np.concatenate([carry, data[start:]]),
+            tol,
+            pool,
+            final=len(carry) + len(data) - start > 4 * _STREAM_CHUNK_SIZE,
+        )
+        yield kept
+    yield from _opheim_simplify_part(axhandle, carry, tol, pool, final=True)
+
+
+def _opheim_simplify_part(
+    axhandle: Axes, data: np.ndarray, tol: float, pool: Executor | None, *, final: bool
+) -> tuple[np.ndarray, np.ndarray]:
+    """Simplify the part of a line that is known so far.
+
+    :returns: the data of the keys before the last one, and the data from the last key on. If
+        the part is final, the latter is its last point.
+    """
+    if _isempty(data):
+        return data, data
+    x_data_vis, y_data_vis = _split_data_2d(_get_visual_data(axhandle, data))
+    keys = _run_opheim_keys(pool, x_data_vis, y_data_vis, tol, final=final)
+    return data[keys[:-1]], data[keys[-1] :]
 
 
 def _clean_collections(
     collection: PathCollection | art3d.Path3DCollection,
+    limits: tuple[np.ndarray, np.ndarray],
     target_resolution: int | list[int] | np.ndarray,
     scale_precision: float,
-) -> None:
+    overlay: CleanFigureOverlay | None,
+) -> _Update | None:
     """Clean a 2D or 3D collection, i.e., scatter plot."""
     axes = collection.axes
     if axes is None:
-        return
+        return None
     figure = axes.figure
     if figure is None:
-        return
+        return None
     cfd = CleanFigureData(
         fig=figure,
         axes=axes,
@@ -235,7 +658,7 @@ def _clean_collections(
     )
 
     cfd.data = _get_collection_data(collection)
-    cfd.x_lim, cfd.y_lim = _get_visual_limits(cfd.axes)
+    cfd.x_lim, cfd.y_lim = limits
     cfd.visual_data = _get_visual_data(cfd.axes, cfd.data)
 
     cfd.has_lines = True
@@ -243,15 +666,478 @@ def _clean_collections(
     cfd.data = _prune_outside_box(cfd)
     cfd.visual_data = _get_visual_data(cfd.axes, cfd.data)
 
-    if not isinstance(collection, art3d.Path3DCollection):
-        cfd.visual_data = _move_points_closer(cfd.x_lim, cfd.y_lim, cfd.visual_data)
-        cfd.visual_data = _get_visual_data(cfd.axes, cfd.visual_data)
-
     cfd.has_markers = True
     cfd.has_lines = False
+    if not isinstance(collection, art3d.Path3DCollection):
+        cfd.data = _move_points_closer(cfd)
+        cfd.visual_data = _get_visual_data(cfd.axes, cfd.data)
+
     data = _simplify_line(cfd)
     data = _limit_precision(cfd.axes, data, cfd.scale_precision)
-    collection.set_offsets(data)
+    return partial(_update_collection, collection, data, overlay)
+
+
+def _update_collection(
+    collection: PathCollection | art3d.Path3DCollection,
+    data: np.ndarray,
+    overlay: CleanFigureOverlay | None,
+) -> None:
+    if overlay is None:
+        collection.set_offsets(data)
+    else:
+        # Like set_offsets, only keep the x and y coordinates
+        overlay.offsets[collection] = np.asarray(data[:, :2], dtype=float)
+
+
+def _clean_line_collection(  # noqa: PLR0913
+    collection: LineCollection,
+    limits: tuple[np.ndarray, np.ndarray],
+    target_resolution: int | list[int] | np.ndarray,
+    scale_precision: float,
+    overlay: CleanFigureOverlay | None,
+    pool: Executor | None,
+) -> _Update | None:
+    """Clean a 2D or 3D line collection, e.g., a streamplot or a wireframe.
+
+    Each segment is pruned and simplified like a line. The number of segments is preserved, as
+    colors and line widths are given per segment; segments that are not visible become empty.
+    """
+    axes = collection.axes
+    if axes is None:
+        return None
+    figure = axes.figure
+    if figure is None:
+        return None
+    segments = _get_line_collection_data(collection)
+    if not segments:
+        return None
+    is_3d = isinstance(collection, art3d.Line3DCollection)
+    cfd = CleanFigureData(
+        fig=figure,
+        axes=axes,
+        target_resolution=target_resolution,
+        scale_precision=scale_precision,
+        has_lines=True,
+        has_markers=False,
+        pool=pool,
+    )
+    cfd.x_lim, cfd.y_lim = limits
+
+    # Transform all segments at once and only prune the segments that leave the box.
+    bounds = np.cumsum([0, *(len(segment) for segment in segments)])
+    visual_data = _get_visual_data(cfd.axes, np.concatenate(segments))
+    tol = 1.0e-10
+    is_in_box = _is_in_box(
+        visual_data, cfd.x_lim + np.array([-tol, tol]), cfd.y_lim + np.array([-tol, tol])
+    )
+
+    reduced = []
+    for segment, start, stop in zip(segments, bounds[:-1], bounds[1:], strict=True):
+        cfd.data = segment
+        cfd.visual_data = visual_data[start:stop]
+        if not np.all(is_in_box[start:stop]):
+            cfd.data = _prune_outside_box(cfd)
+            cfd.visual_data = _get_visual_data(cfd.axes, cfd.data)
+            if not is_3d:
+                cfd.data = _move_points_closer(cfd)
+                cfd.visual_data = _get_visual_data(cfd.axes, cfd.data)
+        reduced.append(_simplify_line(cfd).reshape((-1, segment.shape[1])))
+
+    # Limit the precision of all segments at once, relative to the largest value of all of them.
+    data = _limit_precision(cfd.axes, np.concatenate(reduced), cfd.scale_precision)
+    segments = np.split(data, np.cumsum([len(segment) for segment in reduced])[:-1])
+    return partial(_update_line_collection, collection, segments, overlay)
+
+
+def _update_line_collection(
+    collection: LineCollection, segments: list[np.ndarray], overlay: CleanFigureOverlay | None
+) -> None:
+    is_3d = isinstance(collection, art3d.Line3DCollection)
+    if overlay is None:
+        collection.set_segments(segments)
+        if is_3d and getattr(collection.axes, "M", None) is not None:
+            collection.do_3d_projection()  # type: ignore[attr-defined]
+    elif is_3d:
+        overlay.paths[collection] = _project_segments(collection, segments)
+    else:
+        # The same paths as created by set_segments
+        overlay.paths[collection] = [Path(segment) for segment in segments]
+
+
+def _get_line_collection_data(collection: LineCollection) -> list[np.ndarray]:
+    """Retrieve the 2D or 3D segments of a line collection."""
+    if isinstance(collection, art3d.Line3DCollection):
+        return [
+            np.asarray(segment, dtype=float).reshape((-1, 3))
+            for segment in collection._segments3d  # noqa: SLF001
+        ]
+    return [
+        np.asarray(segment, dtype=float).reshape((-1, 2)) for segment in collection.get_segments()
+    ]
+
+
+def _project_segments(collection: LineCollection, segments: list[np.ndarray]) -> list[Path]:
+    """Returns the paths of 3D segments, projected like matplotlib does when drawing them."""
+    axes = collection.axes
+    if getattr(axes, "M", None) is None:
+        # The figure has not been drawn, so there are no projected paths yet.
+        return []
+    projected = art3d.Line3DCollection(segments, axes=axes)
+    projected.do_3d_projection()
+    return projected.get_paths()
+
+
+def _clean_contour_set(  # noqa: PLR0913
+    contour_set: QuadContourSet,
+    limits: tuple[np.ndarray, np.ndarray],
+    target_resolution: int | list[int] | np.ndarray,
+    scale_precision: float,
+    overlay: CleanFigureOverlay | None,
+    pool: Executor | None,
+) -> _Update | None:
+    """Clean the paths of a 2D contour set.
+
+    Each path holds all contour lines, or filled regions, of one level, as polylines and closed
+    rings that start with a MOVETO. Contour lines are pruned to the visible box like lines. The
+    rings of filled regions cannot be cut open, so they are only removed if they lie outside of
+    the box completely. Afterwards, the polylines and rings are simplified.
+    """
+    axes = contour_set.axes
+    if axes is None:
+        return None
+    figure = axes.figure
+    if figure is None:
+        return None
+    cfd = CleanFigureData(
+        fig=figure,
+        axes=axes,
+        target_resolution=target_resolution,
+        scale_precision=scale_precision,
+        has_lines=True,
+        has_markers=False,
+        pool=pool,
+    )
+    cfd.x_lim, cfd.y_lim = limits
+    paths = [
+        _clean_contour_path(cfd, path, filled=contour_set.filled)
+        for path in contour_set.get_paths()
+    ]
+    return partial(_update_contour_set, contour_set, paths, overlay)
+
+
+def _update_contour_set(
+    contour_set: QuadContourSet, paths: list[Path], overlay: CleanFigureOverlay | None
+) -> None:
+    if overlay is None:
+        contour_set.set_paths(paths)
+    else:
+        overlay.paths[contour_set] = paths
+
+
+def _clean_contour_path(cfd: CleanFigureData, path: Path, *, filled: bool) -> Path:
+    """Prune and simplify the polylines and rings of a path of a contour set."""
+    subpaths = _split_subpaths(path)
+    if subpaths is None:
+        return path
+
+    pieces: list[tuple[np.ndarray, bool]] = []
+    for vertices, closed in subpaths:
+        # Repeat the first vertex of a ring, such that its closing segment is taken into account
+        cfd.data = np.concatenate([vertices, vertices[:1]]) if closed else vertices
+        cfd.visual_data = _get_visual_data(cfd.axes, cfd.data)
+        if filled:
+            if not _overlaps_box(cfd.visual_data, cfd.x_lim, cfd.y_lim):
+                continue
+        else:
+            cfd.data = _prune_outside_box(cfd)
+            cfd.visual_data = _get_visual_data(cfd.axes, cfd.data)
+        data = _simplify_line(cfd)
+
+        id_nan = np.any(np.isnan(data), axis=1)
+        if closed and not np.any(id_nan) and len(data) > 3:  # noqa: PLR2004
+            pieces.append((data[:-1], True))
+        elif not filled:
+            # The ring was cut open by the pruning, or collapsed to a line
+            starts = np.argwhere(id_nan).reshape((-1,))
+            pieces.extend(
+                (piece[~np.any(np.isnan(piece), axis=1)], False)
+                for piece in np.split(data, starts)
+                if np.sum(~np.any(np.isnan(piece), axis=1)) > 1
+            )
+        # Filled rings that collapsed to a line do not cover any area and are removed.
+
+    if not pieces:
+        return Path(np.empty((0, 2)))
+    vertices = _limit_precision(
+        cfd.axes,
+        np.concatenate([np.concatenate([xy, xy[:1]]) if closed else xy for xy, closed in pieces]),
+        cfd.scale_precision,
+    )
+    codes = np.concatenate([_subpath_codes(len(xy), closed=closed) for xy, closed in pieces])
+    return Path(vertices, codes)
+
+
+def _split_subpaths(path: Path) -> list[tuple[np.ndarray, bool]] | None:
+    """Split a path into its polylines and closed rings.
+
+    The vertices of a ring do not include the vertex of its CLOSEPOLY code. ``None`` is returned
+    if the path contains curves.
+    """
+    vertices = np.asarray(path.vertices, dtype=float)
+    if _isempty(vertices):
+        return []
+    if path.codes is None:
+        return [(vertices, False)]
+    codes = np.asarray(path.codes)
+    if not np.all(np.isin(codes, [Path.MOVETO, Path.LINETO, Path.CLOSEPOLY])):
+        return None
+    starts = np.argwhere(codes == Path.MOVETO).reshape((-1,))
+    subpaths = []
+    for xy, subpath_codes in zip(
+        np.split(vertices, starts[1:]), np.split(codes, starts[1:]), strict=True
+    ):
+        closed = subpath_codes[-1] == Path.CLOSEPOLY
+        subpaths.append((xy[:-1] if closed else xy, bool(closed)))
+    return subpaths
+
+
+def _subpath_codes(num_vertices: int, *, closed: bool) -> np.ndarray:
+    """Codes of a polyline, or of a ring, which gets an additional vertex for CLOSEPOLY."""
+    codes = np.full(num_vertices + closed, Path.LINETO, dtype=Path.code_type)
+    codes[0] = Path.MOVETO
+    if closed:
+        codes[-1] = Path.CLOSEPOLY
+    return codes
+
+
+def _overlaps_box(data: np.ndarray, x_lim: np.ndarray, y_lim: np.ndarray) -> bool:
+    """Whether the bounding box of the finite data overlaps the box given by the limits."""
+    data = data[np.all(np.isfinite(data), axis=1)]
+    if _isempty(data):
+        return False
+    return bool(
+        np.min(data[:, 0]) <= x_lim[1]
+        and np.max(data[:, 0]) >= x_lim[0]
+        and np.min(data[:, 1]) <= y_lim[1]
+        and np.max(data[:, 1]) >= y_lim[0]
+    )
+
+
+def _clean_poly3d_collection(
+    collection: art3d.Poly3DCollection,
+    limits: tuple[np.ndarray, np.ndarray],
+    target_resolution: int | list[int] | np.ndarray,
+    overlay: CleanFigureOverlay | None,
+) -> _Update | None:
+    """Decimate the faces of a 3D polygon collection, e.g., a surface plot.
+
+    Faces that lie outside of the projected box of the axes are removed. Faces that are smaller
+    than a pixel are merged with the other small faces in the same pixel and at the same depth,
+    into a quadrilateral that spans their extreme vertices and has their mean color.
+    """
+    axes = collection.axes
+    if not isinstance(axes, Axes3D) or axes.figure is None:
+        return None
+    figure = axes.figure
+    if overlay is not None:
+        # The colors of the faces are sorted when they are projected, so they cannot be combined
+        # with paths that are given by an overlay.
+        warnings.warn(
+            "Cleaning Poly3DCollections is only supported with inplace=True.", stacklevel=3
+        )
+        return None
+    if collection._codes3d is not None:  # noqa: SLF001
+        return None
+    faces = np.asarray(collection._faces, dtype=float)  # noqa: SLF001
+    if faces.size == 0:
+        return None
+    valid = ~np.broadcast_to(collection._invalid_vertices, faces.shape[:2])  # noqa: SLF001
+    num_vertices = np.sum(valid, axis=1)
+
+    x_lim, y_lim = limits
+    visual_data = _get_visual_data_3d(axes, faces.reshape((-1, 3))).reshape(faces.shape)
+    is_finite = np.all(np.isfinite(visual_data) | ~valid[..., np.newaxis], axis=(1, 2))
+    is_finite &= num_vertices > 0
+    lower = np.min(np.where(valid[..., np.newaxis], visual_data, np.inf), axis=1)
+    upper = np.max(np.where(valid[..., np.newaxis], visual_data, -np.inf), axis=1)
+    # Faces with non-finite vertices are left untouched
+    in_view = ~is_finite | (
+        (lower[:, 0] <= x_lim[1])
+        & (upper[:, 0] >= x_lim[0])
+        & (lower[:, 1] <= y_lim[1])
+        & (upper[:, 1] >= y_lim[0])
+    )
+
+    merged = np.zeros(len(faces), dtype=bool)
+    group = np.array([], dtype=np.intp)
+    if not _is_simplification_disabled(target_resolution):
+        width, height = _get_width_height_in_pixels(figure, target_resolution)
+        pixel_size = np.array([(x_lim[1] - x_lim[0]) / width, (y_lim[1] - y_lim[0]) / height])
+        pixel_size = np.append(pixel_size, np.min(pixel_size))
+        is_small = is_finite & in_view & np.all(upper[:, :2] - lower[:, :2] < pixel_size[:2], 1)
+        merged, group = _group_small_faces(visual_data, valid, is_small, pixel_size)
+
+    kept = in_view & ~merged
+    if np.all(kept):
+        return None
+    quads = _merge_faces(faces[merged], valid[merged], visual_data[merged], group)
+    verts: np.ndarray | list[np.ndarray]
+    if np.all(valid[kept]) and faces.shape[1] == quads.shape[1]:
+        verts = np.concatenate([faces[kept], quads])
+    else:
+        verts = [*(face[v] for face, v in zip(faces[kept], valid[kept], strict=True)), *quads]
+    return partial(_update_poly3d_collection, collection, verts, kept, merged, group)
+
+
+def _update_poly3d_collection(
+    collection: art3d.Poly3DCollection,
+    verts: np.ndarray | list[np.ndarray],
+    kept: np.ndarray,
+    merged: np.ndarray,
+    group: np.ndarray,
+) -> None:
+    collection.set_verts(verts)
+    _update_face_colors(collection, kept, merged, group)
+    if getattr(collection.axes, "M", None) is not None:
+        collection.do_3d_projection()
+
+
+def _update_face_colors(
+    collection: art3d.Poly3DCollection, kept: np.ndarray, merged: np.ndarray, group: np.ndarray
+) -> None:
+    """Update the colors of the faces, if they are given per face rather than for all faces."""
+    array = collection.get_array()
+    if array is not None and np.size(array) == len(kept):
+        collection.set_array(_merge_face_values(np.asarray(array), kept, merged, group))
+    for colors, set_colors in (
+        (getattr(collection, "_facecolor3d", None), collection.set_facecolor),
+        (getattr(collection, "_edgecolor3d", None), collection.set_edgecolor),
+    ):
+        if colors is not None and len(colors) == len(kept):
+            set_colors(_merge_face_values(colors, kept, merged, group))
+
+
+def _group_small_faces(
+    visual_data: np.ndarray, valid: np.ndarray, is_small: np.ndarray, pixel_size: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Groups small faces by the pixel and depth of their center.
+
+    :returns: mask of the faces that are merged, as they share their pixel with another small
+        face, and the index of the group of each of these faces.
+    """
+    centers = np.sum(np.where(valid[..., np.newaxis], visual_data, 0.0), axis=1)
+    centers /= np.sum(valid, axis=1)[:, np.newaxis]
+    pixels = np.floor(centers[is_small] / pixel_size).astype(np.int64)
+    _, group, counts = np.unique(pixels, axis=0, return_inverse=True, return_counts=True)
+    group = group.reshape((-1,))
+    is_shared = counts[group] > 1
+
+    merged = np.zeros(len(is_small), dtype=bool)
+    merged[np.flatnonzero(is_small)[is_shared]] = True
+    # Number the groups consecutively
+    _, group = np.unique(group[is_shared], return_inverse=True)
+    return merged, group.reshape((-1,))
+
+
+def _merge_faces(
+    faces: np.ndarray, valid: np.ndarray, visual_data: np.ndarray, group: np.ndarray
+) -> np.ndarray:
+    """Merges the faces of each group into the quadrilateral through their extreme vertices.
+
+    The leftmost, bottommost, rightmost and topmost vertex of a group, in visual coordinates,
+    are in counterclockwise order.
+
+    :returns: the quadrilaterals, with shape [number of groups, 4, 3]
+    """
+    vertices = faces[valid]
+    x_vis = visual_data[..., 0][valid]
+    y_vis = visual_data[..., 1][valid]
+    vertex_group = np.repeat(group, np.sum(valid, axis=1))
+    corners = [_first_of_group(vertex_group, values) for values in (x_vis, y_vis, -x_vis, -y_vis)]
+    return np.stack([vertices[corner] for corner in corners], axis=1)
+
+
+def _first_of_group(group: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Index of the minimal value of each group, for groups that are numbered consecutively."""
+    order = np.lexsort((values, group))
+    is_first = np.diff(group[order], prepend=-1) != 0
+    return order[is_first]
+
+
+def _merge_face_values(
+    values: np.ndarray, kept: np.ndarray, merged: np.ndarray, group: np.ndarray
+) -> np.ndarray:
+    """Values of the kept faces, followed by the mean values of the groups of merged faces."""
+    values = np.asarray(values, dtype=float)
+    if not np.any(merged):
+        return values[kept]
+    merged_values = values[merged].reshape((len(group), -1))
+    counts = np.bincount(group, minlength=np.max(group, initial=-1) + 1)
+    means = np.stack(
+        [
+            np.bincount(group, weights=column, minlength=len(counts)) / counts
+            for column in merged_values.T
+        ],
+        axis=1,
+    )
+    return np.concatenate([values[kept], means.reshape((-1, *values.shape[1:]))])
+
+
+def _clean_fill_between(
+    collection: PolyCollection,
+    limits: tuple[np.ndarray, np.ndarray],
+    target_resolution: int | list[int] | np.ndarray,
+    overlay: CleanFigureOverlay | None,
+    pool: Executor | None,
+) -> _Update | None:
+    """Clean the regions of a fill_between plot.
+
+    Both boundary curves of a region are simplified with the same mask, such that they keep
+    sharing their coordinates along the filled direction and the region can still be exported
+    as two tables that are joined by the fillbetween library of PGFPlots.
+    """
+    axes = collection.axes
+    if not isinstance(axes, Axes) or isinstance(axes, Axes3D):
+        return None
+    figure = axes.figure
+    if figure is None:
+        return None
+    if np.any(np.isinf(target_resolution)) or np.any(np.asarray(target_resolution) == 0):
+        return None
+    x_lim, y_lim = limits
+    width, height = _get_width_height_in_pixels(figure, target_resolution)
+    tol = min((x_lim[1] - x_lim[0]) / width, (y_lim[1] - y_lim[0]) / height)
+
+    verts = []
+    for path in collection.get_paths():
+        boundaries = get_fill_between_boundaries(path)
+        if boundaries is None:
+            # Not the structure of a fill_between region, so leave it untouched.
+            return None
+        first, second = boundaries
+        # Leave the start and end point of the first curve out, as they are not part of the
+        # second curve.
+        mask = np.zeros(len(second), dtype=bool)
+        for curve in (first[1:-1], second):
+            x_vis, y_vis = _split_data_2d(_get_visual_data(axes, curve))
+            if np.size(x_vis) > 2 and np.all(np.isfinite(x_vis)) and np.all(np.isfinite(y_vis)):  # noqa: PLR2004
+                mask = np.logical_or(mask, _opheim_simplify(x_vis, y_vis, tol, pool))
+            else:
+                mask[:] = True
+        verts.append(np.concatenate([first[:1], first[1:-1][mask], first[-1:], second[mask][::-1]]))
+    return partial(_update_fill_between, collection, verts, overlay)
+
+
+def _update_fill_between(
+    collection: PolyCollection, verts: list[np.ndarray], overlay: CleanFigureOverlay | None
+) -> None:
+    if overlay is None:
+        collection.set_verts(verts, closed=True)
+    else:
+        # The same paths as created by set_verts
+        overlay.paths[collection] = [
+            Path(np.concatenate([xy, xy[:1]]), closed=True) for xy in verts
+        ]
 
 
 def _is_step(linehandle: Line2D | art3d.Line3D) -> bool:
@@ -377,15 +1263,14 @@ def _remove_nans(data: np.ndarray) -> np.ndarray:
             np.concatenate([np.diff(id_remove, axis=0) == 1, np.array([False]).reshape((-1,))])
         ]
 
-    id_first = np.argwhere(np.logical_not(id_nan))[0]
-    id_last = np.argwhere(np.logical_not(id_nan))[-1]
+    id_valid = np.argwhere(np.logical_not(id_nan)).reshape((-1,))
 
-    if _isempty(id_first):
+    if _isempty(id_valid):
         # remove entire data
         id_remove = np.arange(len(data))
     else:
         id_remove = np.concatenate(
-            [np.arange(0, id_first[0]), id_remove, np.arange(id_last[0] + 1, len(data))]
+            [np.arange(0, id_valid[0]), id_remove, np.arange(id_valid[-1] + 1, len(data))]
         )
     return np.delete(data, id_remove, axis=0)
 
@@ -435,7 +1320,8 @@ def _get_collection_data(collection: PathCollection | art3d.Path3DCollection) ->
         data = _stack_data_3d(x_data, y_data, z_data)
     else:
         offsets = collection.get_offsets()
-        data = offsets.data  # type: ignore[union-attr]
+        # Copy the data, as it is modified during cleaning
+        data = np.array(offsets.data)  # type: ignore[union-attr]
     return data
 
 
@@ -447,28 +1333,34 @@ def _get_visual_data(axhandle: Axes | Axes3D, data: np.ndarray) -> np.ndarray:
     :returns : visualData
     """
     if isinstance(axhandle, Axes3D):
-        x_data, y_data, z_data = _split_data_3d(data)
-    else:
-        x_data, y_data = _split_data_2d(data)
+        return _get_visual_data_3d(axhandle, data)[:, :2]
 
+    x_data, y_data = _split_data_2d(data)
     if axhandle.get_xscale() == "log":
         x_data = np.log10(x_data)
     if axhandle.get_yscale() == "log":
         y_data = np.log10(y_data)
-    if isinstance(axhandle, Axes3D):
-        if axhandle.get_zscale() == "log":
-            z_data = np.log10(z_data)
+    return _stack_data_2d(x_data, y_data)
 
-        p = _get_projection_matrix(axhandle)
 
-        points = np.stack([x_data, y_data, z_data, np.ones_like(z_data)], axis=1)
-        data_projected = p @ points.T
-        x_data = data_projected[0, :] / data_projected[-1, :]
-        y_data = data_projected[1, :] / data_projected[-1, :]
+def _get_visual_data_3d(axhandle: Axes3D, data: np.ndarray) -> np.ndarray:
+    """Returns the visual representation of 3D data, with the depth as third coordinate.
 
-    x_data = np.reshape(x_data, (-1,))
-    y_data = np.reshape(y_data, (-1,))
-    return _stack_data_2d(x_data, y_data)
+    :returns : visualData, with shape [N, 3]
+    """
+    x_data, y_data, z_data = _split_data_3d(data)
+    if axhandle.get_xscale() == "log":
+        x_data = np.log10(x_data)
+    if axhandle.get_yscale() == "log":
+        y_data = np.log10(y_data)
+    if axhandle.get_zscale() == "log":
+        z_data = np.log10(z_data)
+
+    p = _get_projection_matrix(axhandle)
+
+    points = np.stack([x_data, y_data, z_data, np.ones_like(z_data)], axis=1)
+    data_projected = p @ points.T
+    return (data_projected[:3, :] / data_projected[-1, :]).T
 
 
 def _isempty(array: np.ndarray) -> bool:
@@ -530,54 +1422,142 @@ def _prune_outside_box(cfd: CleanFigureData) -> np.ndarray:
     return _remove_nans(data)
 
 
-def _move_points_closer(x_lim: np.ndarray, y_lim: np.ndarray, data: np.ndarray) -> np.ndarray:
+def _move_points_closer(cfd: CleanFigureData) -> np.ndarray:
     """Move points closer if needed.
 
     Move all points outside a box much larger than the visible one
     to the boundary of that box and make sure that lines in the visible
-    box are preserved. This typically involves replacing one point by
-    two new ones and a NaN.
+    box are preserved. Each point outside of the box is replaced by a NaN,
+    and the segments from and to such points are cut off at the boundary of
+    the box. Without lines, the points outside of the box are removed.
 
     Not implemented: 3D simplification of frontal 2D projection. This requires the
     full transformation rather than the projection, as we have to calculate
     the inverse transformation to project back into 3D.
+
+    :returns: data, with the points outside of the box replaced
     """
-    # Calculate the extension of the extended box
-    x_width = x_lim[1] - x_lim[0]
-    y_width = y_lim[1] - y_lim[0]
+    if cfd.visual_data is None or _isempty(cfd.visual_data):
+        return cfd.data
+
+    large_xlim, large_ylim = _get_large_limits(cfd)
+    is_outside = _is_outside_large_box(cfd.visual_data, large_xlim, large_ylim)
+    id_replace = np.argwhere(is_outside)
+    if _isempty(id_replace):
+        return cfd.data
+    if not cfd.has_lines:
+        return _remove_data(cfd.data, id_replace)
+
+    id_insert, visual_insert = _cut_off_segments(
+        cfd.visual_data, is_outside, large_xlim, large_ylim
+    )
+    data = _replace_data_with_nan(np.array(cfd.data, copy=True), id_replace)
+    data = _insert_data(data, id_insert, _get_data_from_visual(cfd.axes, visual_insert))
+    return _remove_nans(data)
+
+
+def _get_large_limits(cfd: CleanFigureData) -> tuple[np.ndarray, np.ndarray]:
+    """Limits of the box much larger than the visible one, to which points are moved closer."""
+    x_width = cfd.x_lim[1] - cfd.x_lim[0]
+    y_width = cfd.y_lim[1] - cfd.y_lim[0]
 
     # Don't choose the larger box too large to make sure that the values inside
     # it can still be treated by TeX.
     extended_factor = 0.1
-    large_xlim = x_lim + extended_factor * np.array([-x_width, x_width])
-    large_ylim = y_lim + extended_factor * np.array([-y_width, y_width])
-
-    data_is_in_large_box = _is_in_box(data, large_xlim, large_ylim)
-    data_is_in_large_box = np.logical_or(data_is_in_large_box, np.any(np.isnan(data), axis=1))
-    id_replace = np.argwhere(np.logical_not(data_is_in_large_box))
-
-    data_insert = np.array([[]])
-    if not _isempty(id_replace):
-        msg = (
-            "There is data outside of the box. Don't know how to handle during cleaning. "
-            "Please check if x/ylim is to tight"
-        )
-        raise NotImplementedError(msg)
-    data = _insert_data(data, id_replace, data_insert)
-    if _isempty(id_replace):
-        return data
-    raise NotImplementedError
+    large_xlim = cfd.x_lim + extended_factor * np.array([-x_width, x_width])
+    large_ylim = cfd.y_lim + extended_factor * np.array([-y_width, y_width])
+    return large_xlim, large_ylim
 
 
-def _insert_data(
-    data: np.ndarray,
-    id_insert: np.ndarray,
-    data_insert: np.ndarray,  # noqa: ARG001
+def _is_outside_large_box(
+    visual_data: np.ndarray, large_xlim: np.ndarray, large_ylim: np.ndarray
 ) -> np.ndarray:
-    """Inserts the elements of the cell array dataInsert at position id_insert."""
+    """Returns a mask of the finite data points outside of the large box."""
+    data_is_in_large_box = _is_in_box(visual_data, large_xlim, large_ylim)
+    data_is_in_large_box = np.logical_or(
+        data_is_in_large_box, np.any(np.logical_not(np.isfinite(visual_data)), axis=1)
+    )
+    return np.logical_not(data_is_in_large_box)
+
+
+def _cut_off_segments(
+    data: np.ndarray, is_outside: np.ndarray, x_lim: np.ndarray, y_lim: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Determine where the segments from and to points outside of the box cross its boundary.
+
+    A segment from a point outside of the box enters the box at the smallest intersection with
+    the edges of the box; a segment to a point outside of the box leaves it at the largest one.
+    Segments between two points outside of the box that pass through the box get both points.
+
+    :param data: array of data points. Shape [N, 2]
+    :param is_outside: boolean mask that specifies if data point lies outside of the box
+    :param x_lim: x axes limits of the box
+    :param y_lim: y axes limits of the box
+
+    :returns: the indices in front of which the points are to be inserted, and the points
+    """
+    is_finite = np.all(np.isfinite(data), axis=1)
+    id_segment = np.flatnonzero(
+        np.logical_and(
+            np.logical_or(is_outside[:-1], is_outside[1:]),
+            np.logical_and(is_finite[:-1], is_finite[1:]),
+        )
+    )
+    x1 = data[id_segment, :]
+    x2 = data[id_segment + 1, :]
+
+    bottom_left, top_left, bottom_right, top_right = _corners2d(x_lim, y_lim)
+    edges = [
+        (bottom_left, top_left),
+        (bottom_right, top_right),
+        (bottom_left, bottom_right),
+        (top_left, top_right),
+    ]
+    lam = np.stack([_cross_lines(x1, x2, x3, x4) for x3, x4 in edges], axis=1)
+    # Parallel lines give lambda=0, so only the corners of the box count as part of two edges
+    intersects = np.logical_and(
+        np.logical_and(lam[:, :, 0] > 0.0, lam[:, :, 0] < 1.0),
+        np.logical_and(lam[:, :, 1] >= 0.0, lam[:, :, 1] <= 1.0),
+    )
+    lam_enter = np.min(np.where(intersects, lam[:, :, 0], np.inf), axis=1)
+    lam_leave = np.max(np.where(intersects, lam[:, :, 0], -np.inf), axis=1)
+
+    enters = np.logical_and(is_outside[id_segment], np.isfinite(lam_enter))
+    leaves = np.logical_and(is_outside[id_segment + 1], np.isfinite(lam_leave))
+    # Segments between two points outside of the box have to cross it twice
+    passes = np.logical_or(np.logical_not(np.logical_and(enters, leaves)), lam_enter < lam_leave)
+    enters = np.logical_and(enters, passes)
+    leaves = np.logical_and(leaves, passes)
+
+    lam_insert = np.concatenate([lam_enter[enters], lam_leave[leaves]])
+    id_insert = np.concatenate([id_segment[enters], id_segment[leaves]])
+    x1 = np.concatenate([x1[enters], x1[leaves]])
+    x2 = np.concatenate([x2[enters], x2[leaves]])
+    data_insert = x1 + lam_insert[:, np.newaxis] * (x2 - x1)
+
+    # Insert the points in the order of the segments, entering before leaving
+    order = np.argsort(id_insert, kind="stable")
+    return id_insert[order] + 1, data_insert[order]
+
+
+def _insert_data(data: np.ndarray, id_insert: np.ndarray, data_insert: np.ndarray) -> np.ndarray:
+    """Inserts the rows of data_insert in front of the rows id_insert of data.
+
+    Rows that are inserted at the same position keep their order.
+    """
     if _isempty(id_insert):
         return data
-    raise NotImplementedError
+    return np.insert(data, id_insert, data_insert.astype(data.dtype), axis=0)
+
+
+def _get_data_from_visual(axhandle: Axes, visual_data: np.ndarray) -> np.ndarray:
+    """Returns the 2D data for its visual representation, i.e., undoes the log scaling."""
+    x_data, y_data = _split_data_2d(visual_data)
+    if axhandle.get_xscale() == "log":
+        x_data = 10.0**x_data
+    if axhandle.get_yscale() == "log":
+        y_data = 10.0**y_data
+    return _stack_data_2d(x_data, y_data)
 
 
 def _simplify_line(cfd: CleanFigureData) -> np.ndarray:
@@ -592,32 +1572,14 @@ def _simplify_line(cfd: CleanFigureData) -> np.ndarray:
     A scalar value of INF or 0 disables path simplification.
     (default = 600)
     """
-    if (
-        (
-            not isinstance(cfd.target_resolution, (list, np.ndarray))
-            and (np.isinf(cfd.target_resolution) or cfd.target_resolution == 0)
-        )
-        or (
-            isinstance(cfd.target_resolution, (list, np.ndarray))
-            and any(np.logical_or(np.isinf(cfd.target_resolution), cfd.target_resolution == 0))
-        )
-        or cfd.visual_data is None
-    ):
+    if _is_simplification_disabled(cfd.target_resolution) or cfd.visual_data is None:
         return cfd.data
-    width, height = _get_width_height_in_pixels(cfd.fig, cfd.target_resolution)
     x_data_vis, y_data_vis = _split_data_2d(cfd.visual_data)
     # Only simplify if there are more than 2 points
     if np.size(x_data_vis) <= 2 or np.size(y_data_vis) <= 2:  # noqa: PLR2004
         return cfd.data
 
-    # Automatically guess a tol based on the area of the figure and
-    # the area and resolution of the output
-    x_range = cfd.x_lim[1] - cfd.x_lim[0]
-    y_range = cfd.y_lim[1] - cfd.y_lim[0]
-
-    # Conversion factors of data units into pixels
-    x_to_pix = width / x_range
-    y_to_pix = height / y_range
+    x_to_pix, y_to_pix = _get_pixel_scale(cfd)
 
     id_remove = np.array([])
     # If the path has markers, perform pixelation instead of simplification
@@ -658,7 +1620,7 @@ def _simplify_line(cfd: CleanFigureData) -> np.ndarray:
 
             # Line simplification
             if np.size(x) > 2:  # noqa: PLR2004
-                mask = _opheim_simplify(x, y, tol)
+                mask = _opheim_simplify(x, y, tol, cfd.pool)
                 id_removes[ii] = np.argwhere(mask == 0).reshape((-1,)) + line_start[ii]
         # Merge the indices of the line segments
         id_remove = np.concatenate(id_removes)
@@ -667,10 +1629,99 @@ def _simplify_line(cfd: CleanFigureData) -> np.ndarray:
     return _remove_data(cfd.data, id_remove)
 
 
+def _get_pixel_scale(cfd: CleanFigureData) -> tuple[float, float]:
+    """Conversion factors of data units into pixels at the target resolution."""
+    width, height = _get_width_height_in_pixels(cfd.fig, cfd.target_resolution)
+
+    # Automatically guess a tol based on the area of the figure and
+    # the area and resolution of the output
+    x_range = cfd.x_lim[1] - cfd.x_lim[0]
+    y_range = cfd.y_lim[1] - cfd.y_lim[0]
+    return width / x_range, height / y_range
+
+
+def _is_simplification_disabled(target_resolution: int | list[int] | np.ndarray) -> bool:
+    """A scalar value or any value of INF or 0 disables path simplification."""
+    if isinstance(target_resolution, (list, np.ndarray)):
+        return any(np.logical_or(np.isinf(target_resolution), np.asarray(target_resolution) == 0))
+    return bool(np.isinf(target_resolution) or target_resolution == 0)
+
+
+def _simplify_step_line(cfd: CleanFigureData, drawstyle: str) -> np.ndarray:
+    """Reduce the number of data points of a step plot.
+
+    First, the points inside runs of equal values are removed, as far as they do not start or
+    end a step for the given draw style. This does not change the plot at all. Next, of the
+    consecutive points that fall within the same pixel column at the target resolution, only
+    the first and the last points and the points with the minimum and maximum value are kept,
+    such that the vertical extent of the steps within each column is preserved.
+    """
+    data_y = cfd.data[:, 1]
+    mask = _step_run_mask(data_y, drawstyle)
+    if cfd.visual_data is not None and not _is_simplification_disabled(cfd.target_resolution):
+        width, _ = _get_width_height_in_pixels(cfd.fig, cfd.target_resolution)
+        x_to_pix = width / (cfd.x_lim[1] - cfd.x_lim[0])
+        (ids,) = np.nonzero(mask)
+        x_vis, y_vis = _split_data_2d(cfd.visual_data[ids])
+        mask[ids] = _step_pixel_mask(np.floor(x_vis * x_to_pix), y_vis)
+    return cfd.data[mask]
+
+
+def _step_run_mask(y: np.ndarray, drawstyle: str) -> np.ndarray:
+    """Mask of the points that start or end a step of the given draw style.
+
+    With ``steps-post``, a value holds from its own x-coordinate to the next one, so only the
+    first point of a run of equal values is needed. With ``steps-pre``, a value holds from the
+    previous x-coordinate to its own one, so only the last point of a run is needed. With
+    ``steps-mid``, the steps are at the midpoints between the x-coordinates, which are
+    preserved by keeping the first and the last point of each run. The first and the last
+    point of the line, and NaNs, are always kept.
+    """
+    differs = y[1:] != y[:-1]
+    mask = np.ones(np.size(y), dtype=bool)
+    if drawstyle == "steps-post":
+        mask[1:-1] = differs[:-1]
+    elif drawstyle == "steps-mid":
+        mask[1:-1] = differs[:-1] | differs[1:]
+    else:  # "steps-pre" or "steps"
+        mask[1:-1] = differs[1:]
+    return mask
+
+
+def _step_pixel_mask(columns: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Mask of the first, the last, the lowest and the highest point of each group.
+
+    A group consists of consecutive points in the same pixel column. NaNs form their own group,
+    as they interrupt the line.
+    """
+    n = np.size(y)
+    if n <= 4:  # noqa: PLR2004
+        return np.ones(n, dtype=bool)
+    isnan = np.isnan(y) | np.isnan(columns)
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = (columns[1:] != columns[:-1]) | isnan[1:] | isnan[:-1]
+    group = np.cumsum(new_group)
+
+    mask = new_group.copy()
+    # Last point of each group
+    mask[:-1] |= new_group[1:]
+    mask[-1] = True
+    # Lowest and highest point of each group: the first and the last point when sorted by group
+    # and value.
+    order = np.lexsort((y, group))
+    sorted_new_group = np.ones(n, dtype=bool)
+    sorted_new_group[1:] = group[order][1:] != group[order][:-1]
+    mask[order[sorted_new_group]] = True
+    mask[order[np.append(sorted_new_group[1:], True)]] = True
+    return mask
+
+
 def _pixelate(x: np.ndarray, y: np.ndarray, x_to_pix: float, y_to_pix: float) -> np.ndarray:
     """Rough reduction of data points at a multiple of the target resolution.
 
-    The resolution is lost only beyond the multiplier magnification.
+    The resolution is lost only beyond the multiplier magnification. Of all points in the same
+    cell of the pixel grid, only one is kept. The first and last point, as well as NaNs, are
+    always kept.
 
     :param x: x coordinates of data points. Shape [N, ]
     :param y: y coordinates of data points. Shape [N, ]
@@ -680,23 +1731,42 @@ def _pixelate(x: np.ndarray, y: np.ndarray, x_to_pix: float, y_to_pix: float) ->
     :returns: mask
     """
     mult = 2
-    data_pixel = np.round(np.stack([x * x_to_pix * mult, y * y_to_pix * mult], axis=1))
-    id_orig = np.argsort(data_pixel[:, 0])
-    data_pixel_sorted = data_pixel[id_orig, :]
-
-    m = np.logical_or(np.diff(data_pixel_sorted[:, 0]) != 0, np.diff(data_pixel_sorted[:, 1]) != 0)
-    mask_sorted = np.concatenate([np.array([True]).reshape((-1,)), m], axis=0)
-
-    mask = np.ones(x.shape) == 0
-    mask[id_orig] = mask_sorted
+    is_finite = np.logical_and(np.isfinite(x), np.isfinite(y))
+    id_finite = np.flatnonzero(is_finite)
+
+    mask = np.logical_not(is_finite)
+    if not _isempty(id_finite):
+        x_pixel = np.round(x[id_finite] * x_to_pix * mult)
+        y_pixel = np.round(y[id_finite] * y_to_pix * mult)
+        mask[id_finite[_one_per_cell(x_pixel - np.min(x_pixel), y_pixel - np.min(y_pixel))]] = True
     mask[0] = True
     mask[-1] = True
-
-    isnan = np.logical_or(np.isnan(x), np.isnan(y))
-    mask[isnan] = True
     return mask
 
 
+def _one_per_cell(x_pixel: np.ndarray, y_pixel: np.ndarray) -> np.ndarray:
+    """Indices of one point in each occupied cell of the pixel grid.
+
+    :param x_pixel: non-negative x pixel coordinates of the points. Shape [N, ]
+    :param y_pixel: non-negative y pixel coordinates of the points. Shape [N, ]
+    """
+    n = len(x_pixel)
+    num_x = int(np.max(x_pixel)) + 1
+    num_y = int(np.max(y_pixel)) + 1
+    if num_x * num_y >= np.iinfo(np.int64).max:
+        # The pixel coordinates cannot be combined into a single key
+        _, first = np.unique(np.stack([x_pixel, y_pixel], axis=1), axis=0, return_index=True)
+        return first
+    cell = x_pixel.astype(np.int64) * num_y + y_pixel.astype(np.int64)
+    if num_x * num_y <= min(_PIXELATE_TABLE_SIZE, 4 * n):
+        # Few enough cells to look up the first point of every cell in a table, in linear time
+        table = np.full(num_x * num_y, n, dtype=np.intp)
+        np.minimum.at(table, cell, np.arange(n))
+        return table[table < n]
+    order = np.argsort(cell, kind="stable")
+    return order[np.diff(cell[order], prepend=-1) != 0]
+
+
 def _get_width_height_in_pixels(
     fighandle: FigureBase, target_resolution: float | list | np.ndarray
 ) -> tuple[float, float]:
@@ -723,7 +1793,9 @@ def _get_width_height_in_pixels(
     return width, height
 
 
-def _opheim_simplify(x: np.ndarray, y: np.ndarray, tol: float) -> np.ndarray:
+def _opheim_simplify(
+    x: np.ndarray, y: np.ndarray, tol: float, pool: Executor | None = None
+) -> np.ndarray:
     """Opheim path simplification algorithm.
 
      Given a path of vertices V and a tolerance TOL, the algorithm:
@@ -760,6 +1832,8 @@ def _opheim_simplify(x: np.ndarray, y: np.ndarray, tol: float) -> np.ndarray:
     :type y: np.ndarray
     :param tol: scalar float specifying the tolerance for path simplification
     :type tol: float
+    :param pool: process pool in which long paths are simplified, or None
+    :type pool: Executor | None
     :returns: boolean array of shape [N, ] that masks out elements that need not be drawn
     :rtype: np.ndarray
 
@@ -768,44 +1842,117 @@ def _opheim_simplify(x: np.ndarray, y: np.ndarray, tol: float) -> np.ndarray:
     http://citeseerx.ist.psu.edu/viewdoc/download?doi=10.1.1.95.5882&rep=rep1&type=pdf
     """
     mask = np.zeros_like(x) == 1
-    mask[0] = True
-    mask[-1] = True
+    mask[_run_opheim_keys(pool, x, y, tol)] = True
+    return mask
+
+
+def _run_opheim_keys(
+    pool: Executor | None, x: np.ndarray, y: np.ndarray, tol: float, *, final: bool = True
+) -> list[int]:
+    """Run _opheim_keys, in the process pool if the path is long.
+
+    Short paths are simplified right away, as sending them to another process costs more.
+    """
+    if pool is None or np.size(x) < _OPHEIM_PROCESS_SIZE:
+        return _opheim_keys(x, y, tol, final=final)
+    return pool.submit(_opheim_keys, x, y, tol, final=final).result()
+
+
+def _opheim_keys(x: np.ndarray, y: np.ndarray, tol: float, *, final: bool = True) -> list[int]:
+    """Indices of the KEYs of the Opheim path simplification, including the first and last vertex.
+
+    If the path is not final, i.e., it continues beyond its last vertex, only the keys that do
+    not depend on the vertices beyond are returned. The simplification resumes from the last one.
+    """
     n = np.size(x)
+    keys = [0]
     i = 0
+    # Number of vertices processed at once, which adapts to the distance between the keys
+    size = _OPHEIM_BLOCK_SIZE
     while i <= n - 2 - 1:
-        j = i + 1
-        v = np.array([x[j] - x[i], y[j] - y[i]])
-        while j < n - 1 and np.linalg.norm(v) <= tol:
-            j = j + 1
-            v = np.array([x[j] - x[i], y[j] - y[i]])
-        v = v / np.linalg.norm(v)
-
-        # Unit normal to the line between point i and point j
-        normal = np.array([v[1], -v[0]])
-
-        # Find the last point which stays within TOL from the line
-        # connecting i to j, or the last point within a direction change
-        # of pi/2.
-        # Starts from the j+1 points, since all previous points are within
-        # TOL by construction.
-
-        while j < n - 1:
-            # Calculate the perpendicular distance from the i->j line
-            v1 = np.array([x[j + 1] - x[i], y[j + 1] - y[i]])
-            d = np.abs(np.dot(normal, v1))
-            if d > tol:
-                break
-
-            # Calculate the angle between the line from the i->j and the
-            # line from j -> j+1. If
-            v2 = np.array([x[j + 1] - x[j], y[j + 1] - y[i]])
-            anglecosine = np.dot(v, v2)
-            if anglecosine <= 0:
-                break
-            j = j + 1
-        i = j
-        mask[i] = True
-    return mask
+        j = _opheim_line_end(x, y, i, tol, size=size)
+        if j == n - 1 and not final:
+            break
+        key = _opheim_last_vertex(x, y, i, j, tol, size=size)
+        if key == n - 1 and not final:
+            break
+        size = max(_OPHEIM_BLOCK_SIZE, key - i)
+        i = key
+        keys.append(i)
+    if final and keys[-1] != n - 1:
+        keys.append(n - 1)
+    return keys
+
+
+def _opheim_blocks(start: int, stop: int, size: int) -> Iterator[tuple[int, int]]:
+    """Splits the candidate vertices [start, stop) into blocks, each twice as large as before.
+
+    The vertices of a block are processed at once, while the number of vertices that are
+    processed beyond the vertex that is searched for stays proportional to its distance.
+    """
+    while start < stop:
+        yield start, min(start + size, stop)
+        start += size
+        size *= 2
+
+
+def _opheim_line_end(x: np.ndarray, y: np.ndarray, i: int, tol: float, *, size: int) -> int:
+    """Index of the first vertex farther than TOL from the KEY i, or of the last vertex."""
+    n = np.size(x)
+    # The first vertices are checked one by one, as dense keys are often found among them
+    scalar_stop = min(i + 1 + _OPHEIM_SCALAR_CHECKS, n - 1)
+    for k in range(i + 1, scalar_stop):
+        dx = x.item(k) - x.item(i)
+        dy = y.item(k) - y.item(i)
+        if not math.sqrt(dx * dx + dy * dy) <= tol:
+            return k
+    for start, stop in _opheim_blocks(scalar_stop, n - 1, size):
+        distance = np.sqrt((x[start:stop] - x[i]) ** 2 + (y[start:stop] - y[i]) ** 2)
+        (far,) = np.nonzero(~(distance <= tol))
+        if far.size:
+            return start + int(far[0])
+    return n - 1
+
+
+def _opheim_last_vertex(  # noqa: PLR0913
+    x: np.ndarray, y: np.ndarray, i: int, j: int, tol: float, *, size: int
+) -> int:
+    """Index of the LAST vertex, given the KEY i and the LINE from i to j (step 3*)."""
+    n = np.size(x)
+    if j >= n - 1:
+        # The LINE ends at the last vertex, which may coincide with the KEY
+        return n - 1
+    v_x = x.item(j) - x.item(i)
+    v_y = y.item(j) - y.item(i)
+    norm = math.sqrt(v_x * v_x + v_y * v_y)
+    v_x, v_y = v_x / norm, v_y / norm
+
+    # Unit normal to the line between point i and point j
+    normal_x, normal_y = v_y, -v_x
+
+    # Find the last point which stays within TOL from the line connecting i to j, or the last
+    # point within a direction change of pi/2. Starts from the j+1 points, since all previous
+    # points are within TOL by construction. The first points are checked one by one.
+    scalar_stop = min(j + _OPHEIM_SCALAR_CHECKS, n - 1)
+    for k in range(j, scalar_stop):
+        dx_key = x.item(k + 1) - x.item(i)
+        dy_key = y.item(k + 1) - y.item(i)
+        distance = abs(normal_x * dx_key + normal_y * dy_key)
+        anglecosine = v_x * (x.item(k + 1) - x.item(k)) + v_y * dy_key
+        if distance > tol or anglecosine <= 0:
+            return k
+    for start, stop in _opheim_blocks(scalar_stop, n - 1, size):
+        dx_key = x[start + 1 : stop + 1] - x[i]
+        dy_key = y[start + 1 : stop + 1] - y[i]
+        # Perpendicular distance from the i->j line
+        distance = np.abs(normal_x * dx_key + normal_y * dy_key)
+        # Angle between the i->j line and the lines from k to k+1. Note that, as in
+        # matlab2tikz, the y-component of the latter is taken relative to the KEY.
+        anglecosine = v_x * (x[start + 1 : stop + 1] - x[start:stop]) + v_y * dy_key
+        (ends,) = np.nonzero((distance > tol) | (anglecosine <= 0))
+        if ends.size:
+            return start + int(ends[0])
+    return n - 1
 
 
 def _limit_precision(axhandle: Axes | Axes3D, data: np.ndarray, alpha: float) -> np.ndarray:
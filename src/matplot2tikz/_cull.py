@@ -0,0 +1,106 @@
+"""Culling of artists that do not contribute to the figure, before they are converted."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from matplotlib.collections import Collection, PathCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.image import AxesImage
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
+from matplotlib.text import Annotation, Text
+
+from ._util import get_legend_index
+
+if TYPE_CHECKING:
+    from matplotlib.artist import Artist
+
+    from ._tikzdata import TikzData
+
+INVISIBLE = "invisible"
+TRANSPARENT = "transparent"
+EMPTY = "empty"
+OUT_OF_VIEW = "out of view"
+
+
+def cull_reason(data: TikzData, obj: Artist) -> str | None:
+    """Returns why the artist can be skipped, or ``None`` if it has to be converted.
+
+    Artists with an entry in the legend are always converted, such that the legend is complete.
+    """
+    legend_index = get_legend_index(data, obj)
+    if str(obj.get_label()) in legend_index.texts or obj in legend_index.container_labels:
+        return None
+    if not obj.get_visible():
+        return INVISIBLE
+    if _is_transparent(obj):
+        return TRANSPARENT
+    if _is_empty(obj):
+        return EMPTY
+    if _is_out_of_view(data, obj):
+        return OUT_OF_VIEW
+    return None
+
+
+def _is_transparent(obj: Artist) -> bool:
+    if obj.get_alpha() == 0:
+        return True
+    if isinstance(obj, Patch) and not obj.get_hatch():
+        colors = to_rgba_array([obj.get_facecolor(), obj.get_edgecolor()])
+        return not np.any(colors[:, 3])
+    return False
+
+
+def _is_empty(obj: Artist) -> bool:
+    if isinstance(obj, Line2D):
+        return np.size(obj.get_xydata()) == 0
+    if isinstance(obj, PathCollection):
+        return len(obj.get_paths()) == 0 or np.size(obj.get_offsets()) == 0
+    if isinstance(obj, Collection):
+        return len(obj.get_paths()) == 0
+    if isinstance(obj, AxesImage):
+        array = obj.get_array()
+        return array is None or array.size == 0
+    if isinstance(obj, Text) and not isinstance(obj, Annotation):
+        return obj.get_text() == ""
+    return False
+
+
+def _is_out_of_view(data: TikzData, obj: Artist) -> bool:
+    """Whether the artist is clipped to the axes and lies completely outside of them."""
+    axes = data.current_mpl_axes
+    clip_box = obj.get_clip_box()
+    if (
+        axes is None
+        or axes.name != "rectilinear"
+        or obj.axes is not axes
+        or not obj.get_clip_on()
+        or clip_box is None
+        # The table of all bins of a histogram is written at the first one
+        or obj in data.histograms
+        or not isinstance(obj, (Line2D, Patch, Collection))
+    ):
+        return False
+    if isinstance(obj, Collection):
+        extent = obj.get_datalim(axes.transData).transformed(axes.transData)
+    else:
+        extent = obj.get_window_extent()
+    if not np.all(np.isfinite(extent.extents)):
+        return False
+    # Pad by the line width and the marker size, which are not part of the extent
+    pad = _padding_in_points(obj) * axes.figure.dpi / 72.0
+    return not extent.padded(pad).overlaps(clip_box)
+
+
+def _padding_in_points(obj: Line2D | Patch | Collection) -> float:
+    if isinstance(obj, Line2D):
+        return obj.get_linewidth() + obj.get_markersize()
+    if isinstance(obj, Patch):
+        return obj.get_linewidth()
+    linewidths = np.asarray(obj.get_linewidth())
+    pad = float(linewidths.max()) if linewidths.size else 0.0
+    if isinstance(obj, PathCollection) and len(obj.get_sizes()):
+        pad += float(np.sqrt(np.max(obj.get_sizes())))
+    return pad
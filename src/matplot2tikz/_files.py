@@ -36,3 +36,48 @@ def new_filepath(data: TikzData, file_kind: str, ext: str) -> tuple[Path, Path]:
             filepath, rel_filepath = _gen_filepath(data, nb_key, ext)
 
     return filepath, rel_filepath
+
+
+def get_table_code(
+    data: TikzData,
+    plot_table: list[str],
+    opts: list[str],
+    min_extern_length: int = 3,
+    *,
+    closed: bool = False,
+) -> list[str]:
+    """Returns the PGFPlots code of a table, externalized into a dat file if requested.
+
+    :param data: TikzData with various config options.
+    :param plot_table: Rows of the table, each one including the row separator.
+    :param opts: Table options.
+    :param min_extern_length: Minimum number of rows for the table to be externalized.
+    :param closed: Whether the plot is closed by connecting the last and the first row.
+
+    :returns: List of strings with the table code, terminated by a semicolon.
+    """
+    end = " --cycle;\n" if closed else ";\n"
+    content = []
+    if data.externalize_tables and len(plot_table) >= min_extern_length:
+        filepath, rel_filepath = new_filepath(data, "table", ".dat")
+        with filepath.open("w") as f:
+            # No encoding handling required: plot_table is only ASCII
+            f.write("".join(plot_table))
+
+        if data.externals_search_path is not None:
+            esp = data.externals_search_path
+            opts.append(f"search path={{{esp}}}")
+
+        opts_str = ("[" + ",".join(opts) + "] ") if len(opts) > 0 else ""
+        posix_filepath = rel_filepath.as_posix()
+        content.append(f"table {{{opts_str}}}{{{posix_filepath}}}{end}")
+    else:
+        if len(opts) > 0:
+            opts_str = ",".join(opts)
+            content.append(f"table [{opts_str}] {{%\n")
+        else:
+            content.append("table {%\n")
+        content.extend(plot_table)
+        content.append("}" + end)
+
+    return content
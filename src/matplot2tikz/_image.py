@@ -19,6 +19,9 @@ def draw_image(data: TikzData, obj: AxesImage) -> list[str]:
         msg = "No data in image?"
         raise ValueError(msg)
 
+    if data.draft:
+        img_array = _reduce_resolution(data, obj, img_array)
+
     dims = img_array.shape
     if len(dims) == 2:  # noqa: PLR2004
         # the values are given as one real number: look at cmap
@@ -70,3 +73,13 @@ def draw_image(data: TikzData, obj: AxesImage) -> list[str]:
         f"ymin={extent[2]:{ff}}, ymax={extent[3]:{ff}}] {{{posix_filepath}}};\n"
     )
     return content
+
+
+def _reduce_resolution(data: TikzData, obj: AxesImage, img_array: np.ndarray) -> np.ndarray:
+    """Subsamples the image such that it has about the output resolution."""
+    figure = obj.axes.figure
+    extent = obj.get_window_extent()
+    scale = data.dpi / figure.dpi
+    target = (max(1, int(abs(extent.height) * scale)), max(1, int(abs(extent.width) * scale)))
+    steps = [max(1, size // n) for size, n in zip(img_array.shape[:2], target, strict=True)]
+    return img_array[:: steps[0], :: steps[1]]
@@ -68,7 +68,10 @@ def draw_legend(data: TikzData, obj: Legend) -> None:
 def _legend_position_anchor(data: TikzData, obj: Legend, legend_style: list[str]) -> None:
     # Get the location.
     # http://matplotlib.org/api/legend_api.html
-    loc = obj._loc if obj._loc != 0 else _get_location_from_best(obj)  # type: ignore[attr-defined]  # noqa: SLF001
+    loc = obj._loc  # type: ignore[attr-defined]  # noqa: SLF001
+    if loc == 0:
+        # In draft mode, skip the search for the best location and use the upper right corner
+        loc = 1 if data.draft else _get_location_from_best(data, obj)
     pad = 0.03
     position, anchor = {
         1: (None, None),  # upper right
@@ -96,84 +99,53 @@ def _legend_position_anchor(data: TikzData, obj: Legend, legend_style: list[str]
         legend_style.append(f"anchor={anchor}")
 
 
-def _get_location_from_best(obj: Legend) -> int:
-    # Create a renderer
+# Legend locations of matplotlib ("right" is not implemented), with the relative position
+# of the corresponding key point in the legend box and in the axes box.
+_BEST_LOCATIONS = np.array([1, 2, 3, 4, 6, 7, 8, 9, 10])
+_BEST_LOCATION_KEY_POINTS = np.array(
+    [
+        [1.0, 1.0],  # upper right
+        [0.0, 1.0],  # upper left
+        [0.0, 0.0],  # lower left
+        [1.0, 0.0],  # lower right
+        [0.0, 0.5],  # center left
+        [1.0, 0.5],  # center right
+        [0.5, 0.0],  # lower center
+        [0.5, 1.0],  # upper center
+        [0.5, 0.5],  # center
+    ]
+)
+
+
+def _get_location_from_best(data: TikzData, obj: Legend) -> int:
+    # Create a renderer, which is shared by all legends of the figure
     figure = obj.figure
     if not isinstance(figure, Figure):
         raise TypeError
-    renderer = backend_agg.RendererAgg(
-        width=figure.get_figwidth(),
-        height=figure.get_figheight(),
-        dpi=figure.dpi,
-    )
+    if data.legend_renderer is None or data.legend_renderer[0] is not figure:
+        renderer = backend_agg.RendererAgg(
+            width=figure.get_figwidth(),
+            height=figure.get_figheight(),
+            dpi=figure.dpi,
+        )
+        data.legend_renderer = (figure, renderer)
+    renderer = data.legend_renderer[1]
 
     # Rectangles of the legend and of the axes
     # Lower left and upper right points
     x0_legend, x1_legend = obj._legend_box.get_window_extent(renderer).get_points()  # type: ignore[attr-defined]  # noqa: SLF001
     x0_axes, x1_axes = obj.axes.get_window_extent(renderer).get_points()
-    dimension_legend = x1_legend - x0_legend
-    dimension_axes = x1_axes - x0_axes
 
     # To determine the actual position of the legend, check which corner
     # (or center) of the legend is closest to the corresponding corner
     # (or center) of the axes box.
-    # 1. Key points of the legend
-    lower_left_legend = x0_legend
-    lower_right_legend = np.array([x1_legend[0], x0_legend[1]], dtype=np.float64)
-    upper_left_legend = np.array([x0_legend[0], x1_legend[1]], dtype=np.float64)
-    upper_right_legend = x1_legend
-    center_legend = x0_legend + dimension_legend / 2.0
-    center_left_legend = np.array(
-        [x0_legend[0], x0_legend[1] + dimension_legend[1] / 2.0], dtype=np.float64
-    )
-    center_right_legend = np.array(
-        [x1_legend[0], x0_legend[1] + dimension_legend[1] / 2.0], dtype=np.float64
-    )
-    lower_center_legend = np.array(
-        [x0_legend[0] + dimension_legend[0] / 2.0, x0_legend[1]], dtype=np.float64
-    )
-    upper_center_legend = np.array(
-        [x0_legend[0] + dimension_legend[0] / 2.0, x1_legend[1]], dtype=np.float64
-    )
-
-    # 2. Key points of the axes
-    lower_left_axes = x0_axes
-    lower_right_axes = np.array([x1_axes[0], x0_axes[1]], dtype=np.float64)
-    upper_left_axes = np.array([x0_axes[0], x1_axes[1]], dtype=np.float64)
-    upper_right_axes = x1_axes
-    center_axes = x0_axes + dimension_axes / 2.0
-    center_left_axes = np.array(
-        [x0_axes[0], x0_axes[1] + dimension_axes[1] / 2.0], dtype=np.float64
-    )
-    center_right_axes = np.array(
-        [x1_axes[0], x0_axes[1] + dimension_axes[1] / 2.0], dtype=np.float64
-    )
-    lower_center_axes = np.array(
-        [x0_axes[0] + dimension_axes[0] / 2.0, x0_axes[1]], dtype=np.float64
-    )
-    upper_center_axes = np.array(
-        [x0_axes[0] + dimension_axes[0] / 2.0, x1_axes[1]], dtype=np.float64
-    )
-
-    # 3. Compute the distances between comparable points.
-    distances = {
-        1: upper_right_axes - upper_right_legend,  # upper right
-        2: upper_left_axes - upper_left_legend,  # upper left
-        3: lower_left_axes - lower_left_legend,  # lower left
-        4: lower_right_axes - lower_right_legend,  # lower right
-        # 5:, Not Implemented  # right
-        6: center_left_axes - center_left_legend,  # center left
-        7: center_right_axes - center_right_legend,  # center right
-        8: lower_center_axes - lower_center_legend,  # lower center
-        9: upper_center_axes - upper_center_legend,  # upper center
-        10: center_axes - center_legend,  # center
-    }
-    for k, v in distances.items():
-        distances[k] = np.linalg.norm(v, ord=2)
-
-    # 4. Take the shortest distance between key points as the final
-    # location
-    return min(distances, key=lambda k: distances[k])
+    fractions = _BEST_LOCATION_KEY_POINTS
+    key_points_legend = x0_legend * (1.0 - fractions) + x1_legend * fractions
+    key_points_axes = x0_axes * (1.0 - fractions) + x1_axes * fractions
+    distances = np.linalg.norm(key_points_axes - key_points_legend, axis=1)
+
+    # Take the shortest distance between key points as the final location
+    return int(_BEST_LOCATIONS[np.argmin(distances)])
 
 
 def _legend_edgecolor(data: TikzData, obj: Legend, legend_style: list[str]) -> None:
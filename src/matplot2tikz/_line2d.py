@@ -13,7 +13,14 @@ from . import _color as mycol
 from . import _files
 from . import _path as mypath
 from ._markers import _mpl_marker2pgfp_marker
-from ._util import get_legend_text, has_legend, transform_to_data_coordinates
+from ._util import (
+    get_legend_text,
+    get_paths,
+    has_legend,
+    intern_plot_options,
+    screen_resolution_mask,
+    transform_to_data_coordinates,
+)
 
 if TYPE_CHECKING:
     from matplotlib.collections import LineCollection
@@ -59,7 +66,8 @@ def draw_line2d(data: TikzData, obj: Line2D) -> list[str]:
     created, which will be interpreted as an external data source in either the file
     '' or '.tex'.  Instead, render nothing.
     """
-    obj_xdata = obj.get_xdata()
+    overlay_data = _get_overlay_data(data, obj)
+    obj_xdata = obj.get_xdata() if overlay_data is None else overlay_data[:, 0]
     xdata = (
         obj_xdata
         if isinstance(obj_xdata, Iterable) and isinstance(obj_xdata, Sized)
@@ -73,11 +81,12 @@ def draw_line2d(data: TikzData, obj: Line2D) -> list[str]:
     addplot_options = _get_line2d_options(data, obj)
     # Check if a line is in a legend and forget it if not.
     # Fixes <https://github.com/nschloe/tikzplotlib/issues/167>.
-    legend_text = get_legend_text(obj)
+    legend_text = get_legend_text(data, obj)
     if legend_text is None and obj.axes is not None and has_legend(obj.axes):
         addplot_options.append("forget plot")
 
     # process options
+    addplot_options = intern_plot_options(data, addplot_options)
     content = ["\\addplot "]
     if addplot_options:
         opts = ", ".join(addplot_options)
@@ -165,9 +174,12 @@ def draw_linecollection(data: TikzData, obj: LineCollection) -> list[str]:
     edgecolors = obj.get_edgecolors()  # type: ignore[attr-defined]
     linestyles = obj.get_linestyles()  # type: ignore[attr-defined]
     linewidths = obj.get_linewidths()  # type: ignore[attr-defined]
-    paths = obj.get_paths()
+    paths = get_paths(data, obj)
 
     for i, path in enumerate(paths):
+        if np.size(path.vertices) == 0:
+            # E.g., a segment that was removed by clean_figure
+            continue
         color = edgecolors[i] if i < len(edgecolors) else edgecolors[0]
         style = linestyles[i] if i < len(linestyles) else linestyles[0]
         # Ensure that if style is a tuple, that first element is a float
@@ -246,7 +258,15 @@ def _marker_options(data: TikzData, marker_data: MarkerData, addplot_options: li
 
 def _table(data: TikzData, obj: Line2D) -> list[str]:
     xdata, ydata = _get_xy_data(data, obj)
-    ydata_mask = _get_ydata_mask(obj)
+    ydata_mask = _get_ydata_mask(data, obj)
+
+    axes = data.current_mpl_axes
+    if data.draft and axes is not None and not isinstance(xdata[0], datetime.datetime):
+        # Decimate the data to the output resolution
+        ydata[ydata_mask] = np.nan
+        keep = screen_resolution_mask(data, axes, xdata, ydata)
+        xdata, ydata = xdata[keep], ydata[keep]
+        ydata_mask = np.array([], dtype=bool)
 
     if isinstance(xdata[0], datetime.datetime):
         xdata = np.array([date.strftime("%Y-%m-%d %H:%M") for date in xdata])
@@ -256,9 +276,7 @@ def _table(data: TikzData, obj: Line2D) -> list[str]:
         data.current_axis_options.add("date coordinates in=x")
         # Replace float xmin/xmax by datetime
         # <https://github.com/matplotlib/matplotlib/issues/13727>.
-        data.current_axis_options = {
-            option for option in data.current_axis_options if not option.startswith("xmin")
-        }
+        data.current_axis_options.remove_keys("xmin")
         if data.current_mpl_axes is None:
             msg = "Matplotlib axes should be set to get the x-axis limits."
             raise ValueError(msg)
@@ -268,11 +286,7 @@ def _table(data: TikzData, obj: Line2D) -> list[str]:
         data.current_axis_options.add(f"xmin={mindate}, xmax={maxdate}")
 
         # Also remove xtick stuff, as it will result in compilation error in LaTeX
-        data.current_axis_options = {
-            option
-            for option in data.current_axis_options
-            if not option.startswith(("xtick=", "xticklabels="))
-        }
+        data.current_axis_options.remove_keys("xtick", "xticklabels")
     else:
         opts = []
         xformat = data.float_format
@@ -297,37 +311,13 @@ def _table(data: TikzData, obj: Line2D) -> list[str]:
         f"{x:{xformat}}{col_sep}{y:{ff}}{table_row_sep}" for x, y in zip(xdata, ydata, strict=True)
     ]
 
-    min_extern_length = 3
-
-    content = []
-    if data.externalize_tables and len(xdata) >= min_extern_length:
-        filepath, rel_filepath = _files.new_filepath(data, "table", ".dat")
-        with filepath.open("w") as f:
-            # No encoding handling required: plot_table is only ASCII
-            f.write("".join(plot_table))
-
-        if data.externals_search_path is not None:
-            esp = data.externals_search_path
-            opts.append(f"search path={{{esp}}}")
-
-        opts_str = ("[" + ",".join(opts) + "] ") if len(opts) > 0 else ""
-        posix_filepath = rel_filepath.as_posix()
-        content.append(f"table {{{opts_str}}}{{{posix_filepath}}};\n")
-    else:
-        if len(opts) > 0:
-            opts_str = ",".join(opts)
-            content.append(f"table [{opts_str}] {{%\n")
-        else:
-            content.append("table {%\n")
-        content.extend(plot_table)
-        content.append("};\n")
-
-    return content
+    return _files.get_table_code(data, plot_table, opts)
 
 
 def _get_xy_data(data: TikzData, obj: Line2D) -> tuple[np.ndarray, np.ndarray]:
     # get_xydata() always gives float data, no matter what
-    xy = obj.get_xydata()
+    overlay_data = _get_overlay_data(data, obj)
+    xy = obj.get_xydata() if overlay_data is None else overlay_data
     if isinstance(xy, np.ndarray):
         xdata, ydata = xy.T
     else:
@@ -335,7 +325,7 @@ def _get_xy_data(data: TikzData, obj: Line2D) -> tuple[np.ndarray, np.ndarray]:
         raise TypeError(msg)
 
     # get_{x,y}data gives datetime or string objects if so specified in the plotter
-    xdata_alt = obj.get_xdata()
+    xdata_alt = obj.get_xdata() if overlay_data is None else overlay_data[:, 0]
     xdata_iterable = list(xdata_alt) if isinstance(xdata_alt, Iterable) else [xdata_alt]
 
     ff = data.float_format
@@ -344,12 +334,8 @@ def _get_xy_data(data: TikzData, obj: Line2D) -> tuple[np.ndarray, np.ndarray]:
         xdata = np.array(xdata_iterable)
     else:
         if isinstance(xdata_iterable[0], str):
-            # Remove old xtick,xticklabels (if any).
-            data.current_axis_options = {
-                option
-                for option in data.current_axis_options
-                if not option.startswith(("xtick=", "xticklabels="))
-            }
+            # Replace old xtick,xticklabels (if any).
+            data.current_axis_options.remove_keys("xtick", "xticklabels")
             data.current_axis_options.update(
                 [
                     "xtick={{{}}}".format(",".join([f"{x:{ff}}" for x in xdata])),
@@ -368,7 +354,18 @@ def _get_xy_data(data: TikzData, obj: Line2D) -> tuple[np.ndarray, np.ndarray]:
     return xdata, ydata
 
 
-def _get_ydata_mask(obj: Line2D) -> np.ndarray:
+def _get_overlay_data(data: TikzData, obj: Line2D) -> np.ndarray | None:
+    """Returns the x and y data of the line in the overlay of clean_figure, if any."""
+    if data.overlay is None or obj not in data.overlay.lines:
+        return None
+    # Like clean_figure, use the first two coordinates of 3D lines
+    return data.overlay.lines[obj][:, :2]
+
+
+def _get_ydata_mask(data: TikzData, obj: Line2D) -> np.ndarray:
+    if _get_overlay_data(data, obj) is not None:
+        # The reduced data is not masked
+        return np.array([], dtype=bool)
     ydata = obj.get_ydata()
     if not hasattr(ydata, "mask"):
         return np.array([], dtype=bool)
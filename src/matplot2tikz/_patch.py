@@ -4,14 +4,27 @@ from collections.abc import Generator, Iterable
 from itertools import cycle, islice, tee
 from typing import TYPE_CHECKING
 
-from matplotlib.axes import Axes
+import numpy as np
+from matplotlib.container import BarContainer
 from matplotlib.patches import Circle, Ellipse, FancyArrowPatch, Patch, Rectangle
+from matplotlib.path import Path
 from matplotlib.transforms import Affine2D
 
+from . import _files
 from . import _path as mypath
 from ._text import _get_arrow_style
+from ._util import (
+    get_fill_between_boundaries,
+    get_legend_index,
+    get_offsets,
+    get_paths,
+    has_legend,
+    intern_plot_options,
+    is_fill_between,
+)
 
 if TYPE_CHECKING:
+    from matplotlib.axes import Axes
     from matplotlib.collections import Collection
 
     from ._tikzdata import TikzData
@@ -19,6 +32,11 @@ if TYPE_CHECKING:
 
 def draw_patch(data: TikzData, obj: Patch) -> list[str]:
     """Return the PGFPlots code for patches."""
+    histogram = data.histograms.get(obj)
+    if histogram is not None:
+        # All bins are written as one table at the position of the first bin.
+        return _draw_histogram(data, histogram) if histogram.patches[0] is obj else []
+
     if isinstance(obj, FancyArrowPatch):
         draw_options = mypath.get_draw_options(
             data,
@@ -56,20 +74,16 @@ def draw_patch(data: TikzData, obj: Patch) -> list[str]:
     return _draw_polygon(data, obj, draw_options)
 
 
-def _is_in_legend(obj: Collection | Patch) -> bool:
-    label = obj.get_label()
-    if obj.axes is None:
-        return False
-    leg = obj.axes.get_legend()
-    if leg is None:
-        return False
-    return label in [txt.get_text() for txt in leg.get_texts()]
+def _is_in_legend(data: TikzData, obj: Collection | Patch) -> bool:
+    return obj.get_label() in get_legend_index(data, obj).entries
 
 
-def _patch_legend(obj: Collection | Patch, draw_options: list, legend_type: str) -> str:
+def _patch_legend(
+    data: TikzData, obj: Collection | Patch, draw_options: list, legend_type: str
+) -> str:
     """Decorator for handling legend Collection and Patch."""
     legend = ""
-    if _is_in_legend(obj):
+    if _is_in_legend(data, obj):
         # Unfortunately, patch legend entries need \addlegendimage in Pgfplots.
         do = ", ".join([legend_type, *draw_options]) if draw_options else ""
         label = obj.get_label()
@@ -92,6 +106,12 @@ def zip_modulo(*iterables: Iterable) -> Generator:
         yield tuple(next(iterable) for iterable in max_length_iterables)
 
 
+def _ensure_list(x: Iterable | float) -> Iterable:
+    if isinstance(x, float):
+        return [x]
+    return x if sum(1 for _ in x) else [None]
+
+
 def draw_patchcollection(data: TikzData, obj: Collection) -> list[str]:
     """Returns PGFPlots code for a number of patch objects."""
     content = []
@@ -99,36 +119,192 @@ def draw_patchcollection(data: TikzData, obj: Collection) -> list[str]:
     # recompute the face colors
     obj.update_scalarmappable()
 
-    def ensure_list(x: Iterable | float) -> Iterable:
-        if isinstance(x, float):
-            return [x]
-        return x if sum(1 for _ in x) else [None]
-
-    ecs = ensure_list(obj.get_edgecolor())
-    fcs = ensure_list(obj.get_facecolor())
-    lss = ensure_list(obj.get_linestyle())
-    lws = ensure_list(obj.get_linewidth())
-    ts = ensure_list(obj.get_transforms())
-    offs_tmp = obj.get_offsets()
+    ecs = _ensure_list(obj.get_edgecolor())
+    fcs = _ensure_list(obj.get_facecolor())
+    lss = _ensure_list(obj.get_linestyle())
+    lws = _ensure_list(obj.get_linewidth())
+    ts = _ensure_list(obj.get_transforms())
+    offs_tmp = get_offsets(data, obj)
     offs = offs_tmp if isinstance(offs_tmp, Iterable) else [offs_tmp]
-    hatches = ensure_list(obj.get_hatch()) if obj.get_hatch() is not None else [None]
+    hatches = _ensure_list(obj.get_hatch()) if obj.get_hatch() is not None else [None]
 
-    paths = obj.get_paths()
+    # Consecutive patches with the same style are drawn as one compound path. Only
+    # consecutive patches are grouped, such that the drawing order is preserved.
+    style_cache: dict[tuple, list[str]] = {}
+    groups: list[tuple[list[str], list[Path], bool]] = []
+    prev_key = None
     for path, ec, fc, ls, lw, t, off, hatch in zip_modulo(
-        paths, ecs, fcs, lss, lws, ts, offs, hatches
+        get_paths(data, obj), ecs, fcs, lss, lws, ts, offs, hatches
     ):
-        draw_options = mypath.get_draw_options(
-            data, mypath.LineData(obj=obj, ec=ec, fc=fc, ls=ls, lw=lw, hatch=hatch)
+        if np.size(path.vertices) == 0:
+            # E.g., a contour level without any lines
+            continue
+        key = tuple(_hashable(x) for x in (ec, fc, ls, lw, hatch))
+        if key not in style_cache:
+            style_cache[key] = mypath.get_draw_options(
+                data, mypath.LineData(obj=obj, ec=ec, fc=fc, ls=ls, lw=lw, hatch=hatch)
+            )
+        transformed_path = path.transformed(Affine2D(t).translate(*off)) if t is not None else path
+        if groups and key == prev_key:
+            groups[-1][1].append(transformed_path)
+        else:
+            groups.append(
+                (style_cache[key], [transformed_path], _is_stackable(style_cache[key], fc))
+            )
+        prev_key = key
+
+    # The legend shows the style of the first patch
+    legend_options: list[str] = []
+    legend_is_area = False
+    for k, (draw_options, group_paths, is_stackable) in enumerate(groups):
+        compound_path = (
+            _join_polygons(group_paths)
+            if is_stackable or not _bboxes_overlap(group_paths)
+            else None
         )
-        cont, is_area = mypath.draw_path(
-            data,
-            path.transformed(Affine2D(t).translate(*off)) if t is not None else path,
-            draw_options=draw_options,
+        if compound_path is None:
+            for path in group_paths:
+                cont, is_area = mypath.draw_path(data, path, draw_options=draw_options)
+                content.append(cont)
+        else:
+            cont, is_area = mypath.draw_path(data, compound_path, draw_options=draw_options)
+            content.append(cont)
+        if k == 0:
+            legend_options, legend_is_area = draw_options, is_area
+
+    legend_type = "area legend" if legend_is_area else "line legend"
+    content.append(_patch_legend(data, obj, legend_options, legend_type) or "\n")
+
+    return content
+
+
+def _hashable(x: object) -> object:
+    """Converts (nested) arrays and lists into tuples, such that they can be used as a key."""
+    if isinstance(x, (np.ndarray, list, tuple)):
+        return tuple(_hashable(item) for item in x)
+    return x
+
+
+def _is_stackable(draw_options: list[str], fc: np.ndarray | None) -> bool:
+    """Whether overlapping patches of this style look the same when joined into one path.
+
+    A path is filled completely before it is stroked, so the edges of lower patches would show
+    through upper ones. Overlaps of translucent patches would no longer be blended.
+    """
+    is_stroked = any(
+        option.startswith("draw=") and option != "draw=none" for option in draw_options
+    )
+    return not is_stroked and (fc is None or np.asarray(fc)[3] in (0.0, 1.0))
+
+
+def _bboxes_overlap(paths: list[Path]) -> bool:
+    """Whether the bounding boxes of any two of the paths overlap, apart from touching edges."""
+    extents = np.array([path.get_extents().extents for path in paths])
+    order = np.argsort(extents[:, 0], kind="stable")
+    x0, y0, x1, y1 = extents[order].T
+    for i in range(len(paths) - 1):
+        # Only the following paths that start left of the right edge overlap in x direction
+        stop = np.searchsorted(x0, x1[i], side="left")
+        if np.any((y0[i + 1 : stop] < y1[i]) & (y1[i + 1 : stop] > y0[i])):
+            return True
+    return False
+
+
+def _join_polygons(paths: list[Path]) -> Path | None:
+    """Joins polygons into one compound path.
+
+    All polygons are given the same orientation, such that overlapping polygons are not cut out
+    of each other by the nonzero fill rule. None is returned if not all paths are polygons.
+    """
+    if len(paths) == 1:
+        return paths[0]
+    polygons = []
+    for path in paths:
+        vertices = np.asarray(path.vertices)
+        codes = None if path.codes is None else np.asarray(path.codes)
+        if codes is not None and (
+            codes[0] != Path.MOVETO
+            or np.any((codes[1:] != Path.LINETO) & (codes[1:] != Path.CLOSEPOLY))
+            or np.any(codes[1:-1] == Path.CLOSEPOLY)
+        ):
+            return None
+        # The vertex of CLOSEPOLY is meaningless.
+        n = len(vertices) - 1 if codes is not None and codes[-1] == Path.CLOSEPOLY else None
+        x, y = vertices[:n, 0], vertices[:n, 1]
+        signed_area = np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))
+        if signed_area < 0:
+            vertices = vertices.copy()
+            vertices[:n] = vertices[:n][::-1]
+        polygons.append(Path(vertices, codes))
+    return Path.make_compound_path(*polygons)
+
+
+def is_drawable_as_fill_between(data: TikzData, obj: Collection) -> bool:
+    """Check if the collection can be written with the fillbetween library of PGFPlots.
+
+    This is the case for ``fill_between`` plots with a single style and without a colormap.
+    Dates are not supported, because the boundary tables are written with float coordinates.
+    """
+    return (
+        is_fill_between(obj)
+        and obj.get_array() is None
+        and len(obj.get_edgecolor()) <= 1
+        and len(obj.get_facecolor()) <= 1
+        and not mypath._check_x_is_date(data)  # noqa: SLF001
+        and all(get_fill_between_boundaries(path) is not None for path in get_paths(data, obj))
+    )
+
+
+def draw_fill_between(data: TikzData, obj: Collection) -> list[str]:
+    """Returns PGFPlots code for the regions of a ``fill_between`` plot.
+
+    Each region is written as two tables, one per boundary curve, that are joined by the
+    fillbetween library of PGFPlots. Contrary to an inline path, these tables can be
+    externalized.
+    """
+    data.pgfplots_libs.add("fillbetween")
+
+    # A fill_between plot has a single style, see is_drawable_as_fill_between.
+    ec, fc, ls, lw = next(
+        zip_modulo(
+            _ensure_list(obj.get_edgecolor()),
+            _ensure_list(obj.get_facecolor()),
+            _ensure_list(obj.get_linestyle()),
+            _ensure_list(obj.get_linewidth()),
         )
-        content.append(cont)
+    )
+    draw_options = mypath.get_draw_options(
+        data, mypath.LineData(obj=obj, ec=ec, fc=fc, ls=ls, lw=lw, hatch=obj.get_hatch())
+    )
+    fill_options = list(draw_options)
+    if obj.axes is not None and has_legend(obj.axes):
+        fill_options.append("forget plot")
+    fill_options = intern_plot_options(data, fill_options)
 
-    legend_type = "area legend" if is_area else "line legend"
-    content.append(_patch_legend(obj, draw_options, legend_type) or "\n")
+    ff = data.float_format
+    table_row_sep = data.table_row_sep
+    content = []
+    for path in get_paths(data, obj):
+        boundaries = get_fill_between_boundaries(path)
+        if boundaries is None:
+            continue
+        names = []
+        for suffix, boundary in zip("ab", boundaries, strict=True):
+            name = f"fillbetween{data.fill_between_count}{suffix}"
+            names.append(name)
+            plot_table = [f"{x:{ff}} {y:{ff}}{table_row_sep}" for x, y in boundary]
+            opts = []
+            if table_row_sep != "\n":
+                # don't want the \n in the table definition, just in the data (below)
+                opts.append("row sep=" + table_row_sep.strip())
+            content.append(f"\\addplot [draw=none, forget plot, name path={name}]\n")
+            content.extend(_files.get_table_code(data, plot_table, opts))
+        data.fill_between_count += 1
+
+        do = " [{}]".format(", ".join(fill_options)) if fill_options else ""
+        content.append(f"\\addplot{do} fill between [of={names[0]} and {names[1]}];\n")
+
+    content.append(_patch_legend(data, obj, draw_options, "area legend") or "\n")
 
     return content
 
@@ -136,7 +312,7 @@ def draw_patchcollection(data: TikzData, obj: Collection) -> list[str]:
 def _draw_polygon(data: TikzData, obj: Patch, draw_options: list) -> list[str]:
     str_path, is_area = mypath.draw_path(data, obj.get_path(), draw_options=draw_options)
     legend_type = "area legend" if is_area else "line legend"
-    return [str_path, _patch_legend(obj, draw_options, legend_type)]
+    return [str_path, _patch_legend(data, obj, draw_options, legend_type)]
 
 
 def _draw_rectangle(data: TikzData, obj: Rectangle, draw_options: list) -> list[str]:
@@ -149,16 +325,6 @@ def _draw_rectangle(data: TikzData, obj: Rectangle, draw_options: list) -> list[
     if label == "":
         return []
 
-    # Get actual label, bar charts by default only give rectangles labels of
-    # "_nolegend_". See <https://stackoverflow.com/q/35881290/353337>.
-    if isinstance(obj.axes, Axes):
-        handles, labels = obj.axes.get_legend_handles_labels()
-        labels_found = [
-            label for h, label in zip(handles, labels, strict=True) if obj in h.get_children()
-        ]
-        if len(labels_found) == 1:
-            label = labels_found[0]
-
     left_lower_x = obj.get_x()
     left_lower_y = obj.get_y()
 
@@ -176,12 +342,120 @@ def _draw_rectangle(data: TikzData, obj: Rectangle, draw_options: list) -> list[
         f"\\draw[{do}] (axis cs:{left_lower_x:{ff}},{left_lower_y:{ff}}) "
         f"rectangle (axis cs:{right_upper_x:{ff}},{right_upper_y:{ff}});\n"
     ]
+    content.extend(_rectangle_legend(data, obj, draw_options))
+
+    return content
+
+
+def _rectangle_legend(data: TikzData, obj: Rectangle, draw_options: list) -> list[str]:
+    """Return the legend code of a rectangle, which is only added once per label."""
+    label = obj.get_label()
+
+    # Get actual label, bar charts by default only give rectangles labels of
+    # "_nolegend_". See <https://stackoverflow.com/q/35881290/353337>.
+    labels_found = get_legend_index(data, obj).container_labels.get(obj, [])
+    if len(labels_found) == 1:
+        label = labels_found[0]
+
+    if label == "_nolegend_" or str(label) in data.rectangle_legends:
+        return []
+
+    data.rectangle_legends.add(str(label))
+    draw_opts = ",".join(draw_options)
+    return [
+        f"\\addlegendimage{{ybar,ybar legend,{draw_opts}}}\n",
+        f"\\addlegendentry{{{label}}}\n\n",
+    ]
+
+
+def find_histograms(axes: Axes) -> dict[Patch, BarContainer]:
+    """Find the bar containers of the axes that can be written as a single histogram table.
+
+    A bar container qualifies if its vertical bars are adjacent, start at zero and share
+    the same style, which is what ``Axes.hist`` produces.
+
+    :returns: Mapping of each patch of a histogram to its bar container.
+    """
+    histograms: dict[Patch, BarContainer] = {}
+    for container in axes.containers:
+        if isinstance(container, BarContainer) and _is_histogram(axes, container):
+            histograms.update(dict.fromkeys(container.patches, container))
+    return histograms
+
+
+def _is_histogram(axes: Axes, container: BarContainer) -> bool:
+    min_bins = 2
+    patches = container.patches
+    if (
+        getattr(container, "orientation", None) != "vertical"
+        or len(patches) < min_bins
+        or not all(isinstance(patch, Rectangle) for patch in patches)
+        # Hidden bins are not culled from the table, so they are drawn as rectangles
+        or not all(patch.get_visible() for patch in patches)
+        or patches[0].get_label() == ""
+        # Bars on a log scale start at the lower y limit, see _draw_rectangle.
+        or axes.get_yscale() == "log"
+    ):
+        return False
 
-    if label != "_nolegend_" and str(label) not in data.rectangle_legends:
-        data.rectangle_legends.add(str(label))
-        draw_opts = ",".join(draw_options)
-        content.append(f"\\addlegendimage{{ybar,ybar legend,{draw_opts}}}\n")
-        content.append(f"\\addlegendentry{{{label}}}\n\n")
+    left = np.array([patch.get_x() for patch in patches], dtype=float)
+    right = left + np.array([patch.get_width() for patch in patches], dtype=float)
+    bottom = np.array([patch.get_y() for patch in patches], dtype=float)
+    tolerance = 1.0e-10 * (np.max(right) - np.min(left))
+    if np.any(bottom != 0.0) or not np.allclose(left[1:], right[:-1], rtol=0.0, atol=tolerance):
+        return False
+
+    style = _get_histogram_style(patches[0])
+    return all(_get_histogram_style(patch) == style for patch in patches[1:])
+
+
+def _get_histogram_style(obj: Rectangle) -> tuple:
+    return (
+        tuple(obj.get_edgecolor()),
+        tuple(obj.get_facecolor()),
+        obj.get_linestyle(),
+        obj.get_linewidth(),
+        obj.get_hatch(),
+    )
+
+
+def _draw_histogram(data: TikzData, container: BarContainer) -> list[str]:
+    """Return the PGFPlots code for all bins of a histogram as one ``ybar interval`` plot."""
+    patches = container.patches
+    first = patches[0]
+    draw_options = mypath.get_draw_options(
+        data,
+        mypath.LineData(
+            obj=first,
+            ec=first.get_edgecolor(),
+            fc=first.get_facecolor(),
+            ls=first.get_linestyle(),
+            lw=first.get_linewidth(),
+            hatch=first.get_hatch(),
+        ),
+    )
+
+    # With ybar interval, each row gives the left edge and height of a bin. The last row only
+    # gives the right edge of the last bin.
+    edges = [patch.get_x() for patch in patches]
+    edges.append(patches[-1].get_x() + patches[-1].get_width())
+    heights = [patch.get_height() for patch in patches]
+    heights.append(heights[-1])
+
+    ff = data.float_format
+    table_row_sep = data.table_row_sep
+    plot_table = [f"{x:{ff}} {y:{ff}}{table_row_sep}" for x, y in zip(edges, heights, strict=True)]
+    opts = []
+    if table_row_sep != "\n":
+        # don't want the \n in the table definition, just in the data (below)
+        opts.append("row sep=" + table_row_sep.strip())
+
+    addplot_options = ["ybar interval", *draw_options]
+    if first.axes is not None and has_legend(first.axes):
+        addplot_options.append("forget plot")
+    content = ["\\addplot [{}]\n".format(", ".join(intern_plot_options(data, addplot_options)))]
+    content.extend(_files.get_table_code(data, plot_table, opts))
+    content.extend(_rectangle_legend(data, first, draw_options))
 
     return content
 
@@ -202,7 +476,7 @@ def _draw_ellipse(data: TikzData, obj: Ellipse, draw_options: list) -> list[str]
         f"\\draw[{do}] (axis cs:{x:{ff}},{y:{ff}}) ellipse "
         f"({0.5 * obj.width:{ff}} and {0.5 * obj.height:{ff}});\n"
     ]
-    content.append(_patch_legend(obj, draw_options, "area legend"))
+    content.append(_patch_legend(data, obj, draw_options, "area legend"))
 
     return content
 
@@ -214,7 +488,7 @@ def _draw_circle(data: TikzData, obj: Circle, draw_options: list) -> list[str]:
     do = ",".join(draw_options)
     return [
         f"\\draw[{do}] (axis cs:{x:{ff}},{y:{ff}}) circle ({obj.get_radius():{ff}});\n",
-        _patch_legend(obj, draw_options, "area legend"),
+        _patch_legend(data, obj, draw_options, "area legend"),
     ]
 
 
@@ -234,4 +508,4 @@ def _draw_fancy_arrow(data: TikzData, obj: FancyArrowPatch, draw_options: list)
             obj._path_original,  # type: ignore[attr-defined]  # noqa: SLF001
             draw_options=draw_options + style,
         )
-    return [str_path, _patch_legend(obj, draw_options, "line legend")]
+    return [str_path, _patch_legend(data, obj, draw_options, "line legend")]
@@ -21,7 +21,7 @@ from . import _color, _files
 from ._axes import _mpl_cmap2pgf_cmap
 from ._hatches import _mpl_hatch2pgfp_pattern
 from ._markers import _mpl_marker2pgfp_marker
-from ._util import get_legend_text, has_legend
+from ._util import get_legend_text, get_offsets, has_legend, intern_plot_options
 
 
 @dataclass
@@ -60,22 +60,19 @@ def draw_path(
     simplify: bool | None = None,
 ) -> tuple[str, bool]:
     """Adds code for drawing an ordinary path in PGFPlots (TikZ)."""
-    # For some reasons, matplotlib sometimes adds void paths which consist of
-    # only one point and have 0 fill opacity. To not let those clutter the
-    # output TeX file, bail out here.
-    if not isinstance(path.vertices, np.ndarray) or (
-        len(path.vertices) == 2  # noqa: PLR2004
-        and np.all(path.vertices[0] == path.vertices[1])
-        and draw_options is not None
-        and "fill opacity=0" in draw_options
-    ):
+    if _is_void_path(path, draw_options):
         return "", False
 
+    table_path = _draw_path_as_table(data, path, draw_options, simplify=simplify)
+    if table_path is not None:
+        return table_path
+
     x_is_date = _check_x_is_date(data)
 
     nodes = []
     ff = data.float_format
-    xformat = "" if x_is_date else ff
+    # The same format as the date coordinates of line tables
+    xformat = "%Y-%m-%d %H:%M" if x_is_date else ff
     prev = None
     is_area = False
     for vert, code in path.iter_segments(simplify=simplify):
@@ -147,6 +144,72 @@ def draw_path(
     return path_command, is_area
 
 
+def _is_void_path(path: Path, draw_options: list[str] | None) -> bool:
+    """Checks whether the path is not worth drawing."""
+    # For some reasons, matplotlib sometimes adds void paths which consist of
+    # only one point and have 0 fill opacity. To not let those clutter the
+    # output TeX file, bail out here.
+    return not isinstance(path.vertices, np.ndarray) or bool(
+        len(path.vertices) == 2  # noqa: PLR2004
+        and np.all(path.vertices[0] == path.vertices[1])
+        and draw_options is not None
+        and "fill opacity=0" in draw_options
+    )
+
+
+def _draw_path_as_table(
+    data: TikzData,
+    path: Path,
+    draw_options: list[str] | None,
+    *,
+    simplify: bool | None,
+) -> tuple[str, bool] | None:
+    r"""Returns code for drawing a polyline or polygon as an \addplot table.
+
+    Contrary to an inline path, the table can be written to a dat file. Only paths consisting of
+    a single polyline are supported, and only if tables are externalized; otherwise, None is
+    returned.
+    """
+    if not data.externalize_tables or _check_x_is_date(data):
+        return None
+
+    vertices = []
+    codes = []
+    for vert, code in path.iter_segments(simplify=simplify):
+        vertices.append(vert[0:2])
+        codes.append(code)
+    if (
+        len(codes) < 2  # noqa: PLR2004
+        or codes[0] != Path.MOVETO
+        or any(code != Path.LINETO for code in codes[1:-1])
+        or codes[-1] not in (Path.LINETO, Path.CLOSEPOLY)
+    ):
+        return None
+    is_area = bool(codes[-1] == Path.CLOSEPOLY)
+    if is_area:
+        # The vertex of CLOSEPOLY is meaningless.
+        vertices = vertices[:-1]
+
+    ff = data.float_format
+    table_row_sep = data.table_row_sep
+    plot_table = [f"{x:{ff}} {y:{ff}}{table_row_sep}" for x, y in vertices]
+    opts = []
+    if table_row_sep != "\n":
+        # don't want the \n in the table definition, just in the data (below)
+        opts.append("row sep=" + table_row_sep.strip())
+
+    # Contrary to \path, \addplot draws by default. Patches have their own legend handling, so
+    # the plot should not be part of the legend.
+    addplot_options = list(draw_options) if draw_options else []
+    if not any(option.startswith("draw=") for option in addplot_options):
+        addplot_options.insert(0, "draw=none")
+    addplot_options.append("forget plot")
+    addplot_options = intern_plot_options(data, addplot_options)
+    content = ["\\addplot [{}]\n".format(", ".join(addplot_options))]
+    content.extend(_files.get_table_code(data, plot_table, opts, closed=is_area))
+    return "".join(content), is_area
+
+
 def _check_x_is_date(data: TikzData) -> bool:
     if data.current_mpl_axes is None:
         # This shouldn't be the case
@@ -157,14 +220,18 @@ def _check_x_is_date(data: TikzData) -> bool:
         converter = data.current_mpl_axes.xaxis.get_converter()  # type: ignore[attr-defined]
     except AttributeError:
         converter = data.current_mpl_axes.xaxis.converter
-    return isinstance(converter, DateConverter)
+    # Matplotlib registers converters for dates that are not derived from DateConverter, e.g.,
+    # its private _SwitchableDateConverter, so all converters of matplotlib.dates are accepted.
+    return isinstance(converter, DateConverter) or (
+        converter is not None and type(converter).__module__ == DateConverter.__module__
+    )
 
 
 def draw_pathcollection(data: TikzData, obj: PathCollection) -> list[str]:
     """Returns PGFPlots code for a number of patch objects."""
     content = []
     # gather data
-    dd = obj.get_offsets()
+    dd = get_offsets(data, obj)
     if not isinstance(dd, Iterable):
         # No idea what to draw.
         return []
@@ -196,7 +263,8 @@ def draw_pathcollection(data: TikzData, obj: PathCollection) -> list[str]:
             if isinstance(line_style, (str, tuple)):  # Mypy thinks it can also be a float?
                 line_data.ls = line_style
         _draw_pathcollection_add_individual_color(path_collection_data)
-        _draw_pathcollection_get_marker(path_collection_data)
+        if not data.draft:
+            _draw_pathcollection_get_marker(path_collection_data)
 
     _draw_pathcollection_drawoptions(data, path_collection_data, line_data)
 
@@ -205,7 +273,7 @@ def draw_pathcollection(data: TikzData, obj: PathCollection) -> list[str]:
         _draw_pathcollection_scatter_sizes(path_collection_data)
 
         # remove duplicates
-        draw_options = sorted(set(path_collection_data.draw_options))
+        draw_options = intern_plot_options(data, sorted(set(path_collection_data.draw_options)))
 
         max_row_length = 80
         len_row = sum(len(item) for item in draw_options)
@@ -255,7 +323,7 @@ def _draw_pathcollection_scatter_colormap(data: TikzData, pcd: PathCollectionDat
     if pcd.obj.get_cmap():
         mycolormap, is_custom_cmap = _mpl_cmap2pgf_cmap(pcd.obj.get_cmap(), data)
         pcd.draw_options.append("scatter")
-        pcd.draw_options.append("colormap" + ("=" if is_custom_cmap else "/") + mycolormap)
+        pcd.draw_options.append(("colormap name=" if is_custom_cmap else "colormap/") + mycolormap)
 
 
 def _draw_pathcollection_get_edgecolors(
@@ -361,7 +429,7 @@ def _draw_pathcollection_drawoptions(
 
     pcd.draw_options.extend(get_draw_options(data, line_data))
 
-    pcd.legend_text = get_legend_text(pcd.obj)
+    pcd.legend_text = get_legend_text(data, pcd.obj)
     if pcd.legend_text is None and has_legend(pcd.obj.axes):
         pcd.draw_options.append("forget plot")
 
@@ -4,6 +4,7 @@ import logging
 import sys
 import tempfile
 import warnings
+from collections import Counter
 from pathlib import Path
 from typing import TYPE_CHECKING, TypedDict
 
@@ -24,7 +25,9 @@ from typing_extensions import NotRequired, Unpack
 if TYPE_CHECKING:
     from matplotlib.artist import Artist
 
-from . import _axes, _legend, _line2d, _patch, _path, _text
+    from ._cleanfigure import CleanFigureOverlay
+
+from . import _axes, _cull, _legend, _line2d, _patch, _path, _text, _util
 from . import _image as img
 from . import _quadmesh as qmsh
 from .__about__ import __version__
@@ -39,6 +42,10 @@ if not LOGGER.handlers:
     HANDLER.setFormatter(FORMATTER)
     LOGGER.addHandler(HANDLER)
 
+_MODES = ("exact", "draft")
+# Default resolution (in dots per inch) of the output in draft mode
+_DRAFT_DPI = 50
+
 
 class TikzArgs(TypedDict):
     figure: NotRequired[str | Figure]
@@ -63,6 +70,11 @@ class TikzArgs(TypedDict):
     float_format: NotRequired[str]
     table_row_sep: NotRequired[str]
     flavor: NotRequired[str]
+    colormap_tolerance: NotRequired[float | None]
+    fast_ticks: NotRequired[bool]
+    intern_styles: NotRequired[bool]
+    mode: NotRequired[str]
+    overlay: NotRequired[CleanFigureOverlay | None]
 
 
 def get_tikz_code(  # noqa: PLR0913
@@ -89,6 +101,11 @@ def get_tikz_code(  # noqa: PLR0913
     float_format: str = ".15g",
     table_row_sep: str = "\n",
     flavor: str = "latex",
+    colormap_tolerance: float | None = None,
+    fast_ticks: bool = False,  # noqa: FBT001, FBT002
+    intern_styles: bool = False,  # noqa: FBT001, FBT002
+    mode: str = "exact",
+    overlay: CleanFigureOverlay | None = None,
 ) -> str:
     r"""Main function that converts a matplotlib Figure to tikz.
 
@@ -184,6 +201,39 @@ def get_tikz_code(  # noqa: PLR0913
                    Default is ``"latex"``.
     :type flavor: str
 
+    :param colormap_tolerance: If not ``None``, custom color maps are written with as few
+                               control points as possible, such that no color component
+                               (between 0 and 1) deviates more than this tolerance from the
+                               matplotlib color map. Default is ``None``, i.e., color maps are
+                               written exactly.
+    :type colormap_tolerance: float
+
+    :param fast_ticks: Whether to take tick locations and labels directly from the locators
+                       and formatters of the axes, instead of letting matplotlib create and
+                       update a Tick object for every tick, which is slow for figures with
+                       many axes. The style of all ticks is taken from the first tick of each
+                       axis. Only used if ``strict`` is ``False``. Default is ``False``.
+    :type fast_ticks: bool
+
+    :param intern_styles: Whether to define each unique list of plot options once as a style,
+                          ``m2t style <N>``, to which the plots refer by name. This reduces the
+                          size of the output for figures with many plots sharing a few styles.
+                          Default is ``False``.
+    :type intern_styles: bool
+
+    :param mode: Either ``"exact"`` or ``"draft"``. In draft mode, fidelity is traded for
+                 speed, e.g., for live previews: legends with ``loc="best"`` are placed in
+                 the upper right corner, scatter markers are not matched with the matplotlib
+                 markers, ticks are left to PGFPlots, lines are decimated to the output
+                 resolution, and images are written at reduced resolution. The output
+                 resolution is ``dpi`` if given, and 50 otherwise. Default is ``"exact"``.
+    :type mode: str
+
+    :param overlay: Reduced data of the artists, as returned by
+                    ``clean_figure(figure, inplace=False)``, that is exported instead of the
+                    data of the artists. Default is ``None``.
+    :type overlay: CleanFigureOverlay
+
     :returns: None
 
     The following optional attributes of matplotlib's objects are recognized
@@ -201,6 +251,9 @@ def get_tikz_code(  # noqa: PLR0913
             f"Unsupported TeX flavor {flavor!r}. Please choose from {', '.join(map(repr, Flavors))}"
         )
         raise ValueError(msg) from None
+    if mode not in _MODES:
+        msg = f"Unsupported mode {mode!r}. Please choose from {', '.join(map(repr, _MODES))}"
+        raise ValueError(msg)
     data = TikzData(flavor=flavor_object)
 
     data.externalize_tables = externalize_tables
@@ -210,6 +263,10 @@ def get_tikz_code(  # noqa: PLR0913
     data.add_axis_environment = add_axis_environment
     data.show_info = show_info
     data.strict = strict
+    data.draft = mode == "draft"
+    data.overlay = overlay
+    data.fast_ticks = fast_ticks
+    data.intern_styles = intern_styles
     data.standalone = standalone
 
     data.axis_width, data.axis_height = axis_width, axis_height
@@ -221,6 +278,7 @@ def get_tikz_code(  # noqa: PLR0913
         data.extra_groupstyle_options = set(extra_groupstyle_parameters)
     data.float_format = float_format
     data.table_row_sep = table_row_sep
+    data.colormap_tolerance = colormap_tolerance
     if extra_tikzpicture_parameters:
         data.extra_tikzpicture_parameters = set(extra_tikzpicture_parameters)
     if extra_lines_start:
@@ -231,11 +289,7 @@ def get_tikz_code(  # noqa: PLR0913
     if extra_axis_parameters:
         data.extra_axis_parameters = set(extra_axis_parameters).copy()
 
-    if dpi:
-        data.dpi = dpi
-    else:
-        savefig_dpi = mpl.rcParams["savefig.dpi"]
-        data.dpi = savefig_dpi if isinstance(savefig_dpi, int) else mpl.rcParams["figure.dpi"]
+    data.dpi = _get_dpi(data, dpi)
 
     # print message about necessary pgfplot libs to command line
     if show_info:
@@ -249,9 +303,20 @@ def get_tikz_code(  # noqa: PLR0913
     if data.is_in_groupplot_env:
         content.extend(data.flavor.end("groupplot") + "\n\n")
 
+    _log_culled_artists(data)
+
     return _generate_code(data, content)
 
 
+def _get_dpi(data: TikzData, dpi: int | None) -> float:
+    if dpi:
+        return dpi
+    if data.draft:
+        return _DRAFT_DPI
+    savefig_dpi = mpl.rcParams["savefig.dpi"]
+    return savefig_dpi if isinstance(savefig_dpi, int) else mpl.rcParams["figure.dpi"]
+
+
 def _get_figure(figure: str | Figure) -> Figure:
     if figure == "gcf":
         return plt.gcf()
@@ -315,7 +380,17 @@ def _generate_code(data: TikzData, content: list) -> str:
     if coldefs:
         code += "\n".join(coldefs) + "\n\n"
 
-    code += "".join(content)
+    cmapdefs = _get_colormap_definitions(data)
+    if cmapdefs:
+        code += "\n".join(cmapdefs) + "\n\n"
+
+    styledefs = _get_style_definitions(data)
+    if styledefs:
+        code += "\n".join(styledefs) + "\n\n"
+
+    # The content may hold objects, like the options of groupplots, that can only be written
+    # once all the content is known.
+    code += "".join(map(str, content))
 
     if data.wrap and data.add_axis_environment:
         code += data.flavor.end("tikzpicture") + "\n"
@@ -339,6 +414,32 @@ def _get_color_definitions(data: TikzData) -> list:
     return [f"\\definecolor{{{name}}}{{{space}}}{{{val}}}" for name, (space, val) in d.items()]
 
 
+def _get_colormap_definitions(data: TikzData) -> list:
+    """Returns the list of custom color map definitions for the TikZ file."""
+    return [
+        f"\\pgfplotsset{{colormap={{{name}}}{colormap}}}"
+        for name, colormap in data.custom_colormaps.items()
+    ]
+
+
+def _get_style_definitions(data: TikzData) -> list:
+    """Returns the list of interned plot style definitions for the TikZ file."""
+    return [
+        "\\pgfplotsset{{{}/.style={{{}}}}}".format(name, ", ".join(options))
+        for options, name in data.plot_styles.items()
+    ]
+
+
+def _log_culled_artists(data: TikzData) -> None:
+    """Prints the number of artists that were skipped, per reason, if told to show infos."""
+    if not data.show_info or not data.culled_artists:
+        return
+    counts = Counter(reason for _, reason in data.culled_artists)
+    LOGGER.info("Skipped %d artists that are not visible in the figure:", len(data.culled_artists))
+    for reason, count in sorted(counts.items()):
+        LOGGER.info("  %s: %d", reason, count)
+
+
 def _print_pgfplot_libs_message(data: TikzData) -> None:
     """Prints message to screen indicating the use of PGFPlots and its libraries."""
     LOGGER.info("Please add the following lines to your LaTeX preamble:")
@@ -376,6 +477,8 @@ def _draw_collection(data: TikzData, child: Collection) -> list[str]:
         return _line2d.draw_linecollection(data, child)
     if isinstance(child, QuadMesh):
         return qmsh.draw_quadmesh(data, child)
+    if _patch.is_drawable_as_fill_between(data, child):
+        return _patch.draw_fill_between(data, child)
     return _patch.draw_patchcollection(data, child)
 
 
@@ -399,6 +502,9 @@ def _recurse(data: TikzData, obj: Artist) -> list:
             if data.legend_colors:
                 content.extend(data.legend_colors, 0)
 
+        elif (reason := _cull.cull_reason(data, child)) is not None:
+            data.culled_artists.append((child, reason))
+
         else:
             for child_type, process_func in (
                 (Line2D, _line2d.draw_line2d),
@@ -429,6 +535,8 @@ def _process_axes(data: TikzData, obj: Axes, content: _ContentManager) -> None:
         data.current_axis_options.update(data.extra_axis_parameters)
 
     data.current_mpl_axes = obj
+    data.histograms = _patch.find_histograms(obj)
+    data.legend_index = _util.index_legend(obj)
 
     # Run through the child objects, gather the content.
     children_content = _recurse(data, obj)
@@ -441,4 +549,4 @@ def _process_axes(data: TikzData, obj: Axes, content: _ContentManager) -> None:
         # print axis environment options, if told to show infos
         if data.show_info:
             LOGGER.info("These would have been the properties of the environment:")
-            LOGGER.info("".join(ax.get_begin_code()[1:]))
+            LOGGER.info("".join(map(str, ax.get_begin_code()[1:])))
@@ -6,7 +6,67 @@ from pathlib import Path
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from matplotlib.artist import Artist
     from matplotlib.axes import Axes
+    from matplotlib.backends.backend_agg import RendererAgg
+    from matplotlib.colorbar import Colorbar
+    from matplotlib.figure import Figure
+
+    from ._axes import GroupplotOptions
+    from ._cleanfigure import CleanFigureOverlay
+    from ._util import LegendIndex
+
+
+class AxisOptions:
+    """Options of an axis, indexed by their key.
+
+    The key of an option is the part before the first equals sign. Adding an option never
+    replaces another one, as pgfplots accepts repeated keys, e.g., of styles. Options are only
+    replaced explicitly, by removing their key first.
+    """
+
+    def __init__(self, options: Iterable[str] = ()) -> None:
+        # Options in the order in which they are added, without duplicates
+        self._options: dict[str, None] = {}
+        self._keys: dict[str, set[str]] = {}
+        self.update(options)
+
+    @staticmethod
+    def key(option: str) -> str:
+        return option.split("=", 1)[0].strip()
+
+    def add(self, option: str) -> None:
+        if option not in self._options:
+            self._options[option] = None
+            self._keys.setdefault(self.key(option), set()).add(option)
+
+    def update(self, options: Iterable[str]) -> None:
+        for option in options:
+            self.add(option)
+
+    def remove(self, option: str) -> None:
+        del self._options[option]
+        self._keys[self.key(option)].discard(option)
+
+    def remove_keys(self, *keys: str) -> None:
+        for key in keys:
+            for option in self._keys.pop(key, set()):
+                del self._options[option]
+
+    def __contains__(self, option: object) -> bool:
+        return option in self._options
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._options)
+
+    def __len__(self) -> int:
+        return len(self._options)
+
+    def sorted(self) -> list[str]:
+        """Returns the options in a deterministic order to avoid diff churn."""
+        return sorted(self._options)
 
 
 @dataclass
@@ -20,12 +80,17 @@ class TikzData:
     add_axis_environment: bool = True
     show_info: bool = False
     strict: bool = False
+    draft: bool = False
+    fast_ticks: bool = False
+    intern_styles: bool = False
     standalone: bool = False
     is_in_groupplot_env: bool = False
 
-    dpi: int = 100
+    dpi: float = 100
+    fill_between_count: int = 0
     font_size: float = 10.0
 
+    colormap_tolerance: float | None = None
     axis_width: str | None = None
     axis_height: str | None = None
     externals_search_path: str | None = None
@@ -43,15 +108,27 @@ class TikzData:
     extra_axis_parameters: set[str] = field(default_factory=set)
     extra_groupstyle_options: set[str] = field(default_factory=set)
     extra_tikzpicture_parameters: set[str] = field(default_factory=set)
-    current_axis_options: set[str] = field(default_factory=set)
+    current_axis_options: AxisOptions = field(default_factory=AxisOptions)
+    colorbar_axes: set[Axes] = field(default_factory=set)
 
     legend_colors: list[str] = field(default_factory=list)
+    # Artists that were not converted, with the reason (see _cull.py)
+    culled_artists: list[tuple[Artist, str]] = field(default_factory=list)
     extra_lines_start: list[str] = field(default_factory=list)
 
     custom_colors: dict = field(default_factory=dict)
+    custom_colormaps: dict = field(default_factory=dict)
+    colormaps: dict = field(default_factory=dict)
+    plot_styles: dict = field(default_factory=dict)
     nb_keys: dict = field(default_factory=dict)
+    histograms: dict = field(default_factory=dict)
+    axes_colorbars: dict[Axes, Colorbar | None] = field(default_factory=dict)
 
+    overlay: CleanFigureOverlay | None = None
     current_mpl_axes: Axes | None = None
+    current_groupplot: GroupplotOptions | None = None
+    legend_index: LegendIndex | None = None
+    legend_renderer: tuple[Figure, RendererAgg] | None = None
 
 
 class Flavors(enum.Enum):
@@ -94,7 +171,7 @@ class Flavors(enum.Enum):
 
     def preamble(self, data: TikzData | None = None) -> str:
         if data is None:
-            pgfplotslibs = "groupplots,dateplot"
+            pgfplotslibs = "groupplots,dateplot,fillbetween"
             tikzlibs = "patterns,shapes.arrows"
         else:
             pgfplotslibs = ",".join(data.pgfplots_libs)
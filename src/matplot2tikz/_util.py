@@ -4,43 +4,165 @@ from __future__ import annotations
 
 import functools
 import re
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
+import matplotlib.collections
 import matplotlib.transforms
 import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.path import Path
 
 if TYPE_CHECKING:
-    from matplotlib.axes import Axes
-    from matplotlib.collections import PathCollection
+    from collections.abc import Sequence
+
+    from matplotlib.artist import Artist
+    from matplotlib.collections import Collection, PathCollection
     from matplotlib.lines import Line2D
     from mpl_toolkits.mplot3d import Axes3D
+    from numpy.typing import ArrayLike
+
+    from ._tikzdata import TikzData
 
 
 def has_legend(axes: Axes | Axes3D) -> bool:
     return axes.get_legend() is not None
 
 
-def get_legend_text(obj: Line2D | PathCollection) -> str | None:
-    """Check if line is in legend."""
-    if obj.axes is None:
-        return None
-    leg = obj.axes.get_legend()
+@dataclass
+class LegendIndex:
+    """Legend entries of an axes, such that artists can look up their label in constant time."""
+
+    axes: Axes | None = None
+    # Legend text of each label of a legend handle
+    texts: dict[str, str] = field(default_factory=dict)
+    # All texts of the legend
+    entries: set[str] = field(default_factory=set)
+    # Labels of the legend handles, e.g., bar containers, that contain an artist
+    container_labels: dict[Artist, list[str]] = field(default_factory=dict)
+
+
+def index_legend(axes: Axes | None) -> LegendIndex:
+    """Collects the legend entries of the axes."""
+    index = LegendIndex(axes=axes)
+    if axes is None:
+        return index
+
+    # Get actual label, bar charts by default only give rectangles labels of
+    # "_nolegend_". See <https://stackoverflow.com/q/35881290/353337>.
+    for handle, label in zip(*axes.get_legend_handles_labels(), strict=True):
+        for child in handle.get_children():
+            index.container_labels.setdefault(child, []).append(label)
+
+    leg = axes.get_legend()
     if leg is None:
-        return None
+        return index
 
     try:
         leg_handles = leg.legend_handles  # matplotlib version >= 3.7.0
     except AttributeError:
         leg_handles = leg.legendHandles  # type: ignore[attr-defined]  # matplotlib version < 3.7.0
-    keys = [h.get_label() for h in leg_handles if h is not None]
+    keys = [str(h.get_label()) for h in leg_handles if h is not None]
     values = [t.get_text() for t in leg.texts]
+    index.texts = dict(zip(keys, values, strict=True))
+    index.entries = set(values)
+    return index
+
+
+def get_legend_index(data: TikzData, obj: Artist) -> LegendIndex:
+    """Returns the legend index of the axes of the object.
+
+    The index of the current axes is computed once when the axes is entered.
+    """
+    axes = obj.axes if isinstance(obj.axes, Axes) else None
+    if data.legend_index is None or data.legend_index.axes is not axes:
+        data.legend_index = index_legend(axes)
+    return data.legend_index
+
+
+def get_legend_text(data: TikzData, obj: Line2D | PathCollection) -> str | None:
+    """Check if line is in legend."""
+    return get_legend_index(data, obj).texts.get(str(obj.get_label()))
+
+
+def is_fill_between(obj: Collection) -> bool:
+    """Check if the collection is created by ``fill_between`` or ``fill_betweenx``."""
+    fill_between_class = getattr(matplotlib.collections, "FillBetweenPolyCollection", None)
+    return fill_between_class is not None and isinstance(obj, fill_between_class)
+
+
+def get_paths(data: TikzData, obj: Collection) -> Sequence[Path]:
+    """Returns the paths of the collection, or the reduced paths of the overlay, if any."""
+    if data.overlay is not None and obj in data.overlay.paths:
+        return data.overlay.paths[obj]
+    return obj.get_paths()
+
+
+def get_offsets(data: TikzData, obj: Collection) -> ArrayLike:
+    """Returns the offsets of the collection, or the reduced offsets of the overlay, if any."""
+    if data.overlay is not None and obj in data.overlay.offsets:
+        return data.overlay.offsets[obj]
+    return obj.get_offsets()
+
 
-    label = obj.get_label()
-    d = dict(zip(keys, values, strict=True))
-    if label in d:
-        return d[label]
+def get_fill_between_boundaries(path: Path) -> tuple[np.ndarray, np.ndarray] | None:
+    """Split a region of a ``fill_between`` plot into its two boundary curves.
 
-    return None
+    matplotlib builds the polygon as: the start point, the n points of the first curve, the end
+    point, and the n points of the second curve in reversed order. The first returned curve
+    includes the start and end point, such that the region is the polygon that follows the
+    first curve and returns along the second one.
+
+    :returns: (first_curve, second_curve) with shapes [n+2, 2] and [n, 2], or None if the path
+              does not have the structure of a ``fill_between`` region.
+    """
+    vertices = np.asarray(path.vertices)
+    codes = None if path.codes is None else np.asarray(path.codes)
+    if codes is not None:
+        if codes[-1] == Path.CLOSEPOLY:
+            vertices = vertices[:-1]
+            codes = codes[:-1]
+        if len(codes) == 0 or codes[0] != Path.MOVETO or np.any(codes[1:] != Path.LINETO):
+            return None
+    n = (len(vertices) - 2) // 2
+    if n < 1 or len(vertices) != 2 * n + 2:
+        return None
+    return vertices[: n + 2], vertices[n + 2 :][::-1]
+
+
+def intern_plot_options(data: TikzData, options: list[str]) -> list[str]:
+    """Replaces the options of a plot by a style if styles are interned.
+
+    Each unique list of options is registered once as a style, which is defined at the start of
+    the TikZ picture, see data.plot_styles. The forget plot key is kept out of the style.
+    """
+    if not data.intern_styles:
+        return options
+    style_options = tuple(option for option in options if option != "forget plot")
+    if not style_options:
+        return options
+    if style_options not in data.plot_styles:
+        data.plot_styles[style_options] = f"m2t style {len(data.plot_styles)}"
+    interned = [data.plot_styles[style_options]]
+    if len(style_options) < len(options):
+        interned.append("forget plot")
+    return interned
+
+
+def screen_resolution_mask(
+    data: TikzData, axes: Axes, xdata: np.ndarray, ydata: np.ndarray
+) -> np.ndarray:
+    """Mask of the points of a line that are visible at the output resolution.
+
+    A point is dropped if it falls on the same pixel as its predecessor. The first and the last
+    point and non-finite points, at which the line is interrupted, are always kept.
+    """
+    scale = data.dpi / axes.figure.dpi
+    pixels = np.round(axes.transData.transform(np.column_stack([xdata, ydata])) * scale)
+    mask = np.ones(len(pixels), dtype=bool)
+    mask[1:] = np.any(pixels[1:] != pixels[:-1], axis=1)
+    mask[-1] = True
+    return mask | ~np.all(np.isfinite(pixels), axis=1)
 
 
 def transform_to_data_coordinates(
@@ -0,0 +1,65 @@
+"""Benchmark the draft mode against the exact mode on the reference figures.
+
+Run from the root of the repository with ``python -m tests.benchmark_draft``.
+"""
+
+import argparse
+import importlib
+import pathlib
+import time
+import warnings
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+
+import matplot2tikz as mp2t
+
+mpl.use("Agg")
+
+
+def _time(module_name: str, mode: str, repeat: int) -> float:
+    module = importlib.import_module(f"tests.{module_name}")
+    best = float("inf")
+    for _ in range(repeat):
+        module.plot()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            start = time.perf_counter()
+            mp2t.get_tikz_code(include_disclaimer=False, mode=mode)
+            best = min(best, time.perf_counter() - start)
+        plt.close("all")
+    return best
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the speed of draft and exact mode.")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per figure and mode")
+    args = parser.parse_args()
+
+    this_dir = pathlib.Path(__file__).resolve().parent
+    test_modules = sorted(
+        f.stem
+        for f in this_dir.glob("test_*.py")
+        if (this_dir / f"{f.stem}_reference.tex").exists()
+    )
+
+    total_exact = total_draft = 0.0
+    print(f"{'figure':<35} {'exact [ms]':>11} {'draft [ms]':>11} {'speedup':>8}")  # noqa: T201
+    for mod in test_modules:
+        try:
+            exact = _time(mod, "exact", args.repeat)
+            draft = _time(mod, "draft", args.repeat)
+        except Exception as e:  # noqa: BLE001
+            print(f"{mod:<35} skipped ({type(e).__name__})")  # noqa: T201
+            continue
+        total_exact += exact
+        total_draft += draft
+        print(f"{mod:<35} {exact * 1e3:>11.2f} {draft * 1e3:>11.2f} {exact / draft:>7.2f}x")  # noqa: T201
+    print(  # noqa: T201
+        f"{'total':<35} {total_exact * 1e3:>11.2f} {total_draft * 1e3:>11.2f} "
+        f"{total_exact / total_draft:>7.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    _main()
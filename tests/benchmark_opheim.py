@@ -0,0 +1,49 @@
+"""Benchmark the Opheim line simplification of clean_figure on long lines.
+
+A smooth line has few keys far apart, a noisy random walk has a key at almost every vertex.
+
+Run from the root of the repository with ``python -m tests.benchmark_opheim``.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from matplot2tikz._cleanfigure import _opheim_simplify
+
+from .test_cleanfigure import opheim_simplify_loop
+
+
+def _compare(name: str, x: np.ndarray, y: np.ndarray, tol: float) -> None:
+    start = time.perf_counter()
+    mask_loop = opheim_simplify_loop(x, y, tol)
+    time_loop = time.perf_counter() - start
+    start = time.perf_counter()
+    mask = _opheim_simplify(x, y, tol)
+    time_blocks = time.perf_counter() - start
+
+    same = np.array_equal(mask, mask_loop)
+    print(f"{name}, points: {np.size(x)}, kept: {np.sum(mask)}, same mask: {same}")  # noqa: T201
+    print(f"vertex by vertex: {time_loop:.3f} s")  # noqa: T201
+    print(f"blocks:           {time_blocks:.3f} s ({time_loop / time_blocks:.1f}x faster)")  # noqa: T201
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the Opheim implementations.")
+    parser.add_argument("--points", type=int, default=1_000_000, help="points of the smooth line")
+    parser.add_argument("--tol", type=float, default=1e-3, help="tolerance for the smooth line")
+    parser.add_argument("--walk-points", type=int, default=200_000, help="points of the walk")
+    parser.add_argument("--walk-tol", type=float, default=1e-4, help="tolerance for the walk")
+    args = parser.parse_args()
+
+    x = np.linspace(0, 100, args.points)
+    _compare("smooth line", x, np.sin(x), args.tol)
+
+    rng = np.random.default_rng(0)
+    steps = rng.normal(scale=1e-3, size=(2, args.walk_points))
+    _compare("random walk", np.cumsum(steps[0]), np.cumsum(steps[1]), args.walk_tol)
+
+
+if __name__ == "__main__":
+    _main()
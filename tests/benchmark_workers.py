@@ -0,0 +1,57 @@
+"""Benchmark clean_figure with several workers against a single one.
+
+The figure has 64 subplots with a noisy line each, whose simplification is the bulk of the work.
+
+Run from the root of the repository with ``python -m tests.benchmark_workers``.
+"""
+
+import argparse
+import os
+import time
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+
+from matplot2tikz import clean_figure
+
+mpl.use("Agg")
+
+
+def _plot(points: int) -> plt.Figure:
+    fig, axes = plt.subplots(8, 8)
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 1, points)
+    for ax in axes.flat:
+        ax.plot(x, np.cumsum(rng.normal(size=points)))
+    return fig
+
+
+def _time(fig: plt.Figure, workers: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        clean_figure(fig, inplace=False, workers=workers)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Compare clean_figure with several workers.")
+    parser.add_argument("--points", type=int, default=100_000, help="points per line")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="workers")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per number of workers")
+    args = parser.parse_args()
+
+    fig = _plot(args.points)
+    serial = _time(fig, 1, args.repeat)
+    parallel = _time(fig, args.workers, args.repeat)
+    plt.close(fig)
+
+    print(f"cores: {os.cpu_count()}, points per line: {args.points}")  # noqa: T201
+    print(f"1 worker:   {serial:.3f} s")  # noqa: T201
+    print(f"{args.workers} workers: {parallel:.3f} s ({serial / parallel:.2f}x faster)")  # noqa: T201
+
+
+if __name__ == "__main__":
+    _main()
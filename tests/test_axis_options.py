@@ -0,0 +1,30 @@
+"""Test that extra axis options are kept next to the generated ones with the same key."""
+
+import matplotlib as mpl
+from matplotlib import pyplot as plt
+
+from matplot2tikz import get_tikz_code
+
+mpl.use("Agg")
+
+
+def test_legend_style() -> None:
+    fig, ax = plt.subplots()
+    ax.plot([0, 1], [0, 1], label="line")
+    ax.legend()
+    code = get_tikz_code(fig, extra_axis_parameters=["legend style={font=\\small}"])
+    plt.close(fig)
+
+    assert "legend style={font=\\small}" in code
+    assert "legend style={\n" in code
+
+
+def test_limits() -> None:
+    fig, ax = plt.subplots()
+    ax.plot([0, 1], [0, 1])
+    ax.set_xlim(-1, 2)
+    code = get_tikz_code(fig, extra_axis_parameters=["xmin=0"])
+    plt.close(fig)
+
+    assert "xmin=0,\n" in code
+    assert "xmin=-1, xmax=2" in code
@@ -5,11 +5,14 @@ import numpy as np
 import pytest
 from matplotlib import colors as mcolors
 from matplotlib import pyplot as plt
-from matplotlib.collections import PolyCollection
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.lines import Line2D
+from matplotlib.path import Path
 from matplotlib.ticker import FormatStrFormatter, LinearLocator
 from mpl_toolkits.mplot3d import axes3d
 
 from matplot2tikz import clean_figure, get_tikz_code
+from matplot2tikz._cleanfigure import _opheim_simplify, _pixelate
 
 mpl.use("Agg")
 
@@ -47,18 +50,45 @@ class TestPlottypes:
             assert num_lines_raw - num_lines_clean == line_difference
         plt.close("all")
 
-    def test_step(self) -> None:
-        """Test if clean_figure runs (with warning)."""
-        x = np.linspace(1, 100, 20)
-        y = np.linspace(1, 100, 20)
+    @pytest.mark.parametrize(
+        ("where", "expected_x"),
+        [
+            ("pre", [0, 249, 499, 749, 999]),
+            ("post", [0, 250, 500, 750, 999]),
+            ("mid", [0, 249, 250, 499, 500, 749, 750, 999]),
+        ],
+    )
+    def test_step(self, where: str, expected_x: list[int]) -> None:
+        """Test that runs of equal values of a step plot are collapsed."""
+        x = np.arange(1000)
+        y = np.repeat([1.0, 3.0, 2.0, 5.0], 250)
 
         with plt.rc_context(rc=RC_PARAMS):
             fig, ax = plt.subplots(1, 1, figsize=(5, 5))
-            ax.step(x, y)
-            ax.set_ylim(20, 80)
-            ax.set_xlim(20, 80)
-            with pytest.warns(Warning, match="step plot simplification not yet implemented."):
-                clean_figure(fig)
+            (line,) = ax.step(x, y, where=where)
+            clean_figure(fig)
+            np.testing.assert_array_equal(line.get_xdata(), expected_x)
+            np.testing.assert_array_equal(line.get_ydata(), y[expected_x])
+        plt.close("all")
+
+    def test_step_pixels(self) -> None:
+        """Test that steps within a pixel column are reduced to their vertical extent."""
+        rng = np.random.default_rng(0)
+        x = np.linspace(0, 1, 100000)
+        y = rng.normal(size=x.size)
+
+        with plt.rc_context(rc=RC_PARAMS):
+            fig, ax = plt.subplots(1, 1, figsize=(5, 5))
+            (line,) = ax.step(x, y, where="post")
+            clean_figure(fig, target_resolution=100)
+            ydata = line.get_ydata()
+            # At most four points for each of the 500 pixel columns of the figure.
+            assert len(ydata) <= 4 * 500
+            # The values are only changed by the limited precision.
+            assert np.min(ydata) == pytest.approx(np.min(y), abs=1e-3)
+            assert np.max(ydata) == pytest.approx(np.max(y), abs=1e-3)
+            assert ydata[0] == pytest.approx(y[0], abs=1e-3)
+            assert ydata[-1] == pytest.approx(y[-1], abs=1e-3)
         plt.close("all")
 
     def test_scatter(self) -> None:
@@ -85,6 +115,75 @@ class TestPlottypes:
             assert num_lines_raw - num_lines_clean == line_difference
         plt.close("all")
 
+    def test_fill_between(self) -> None:
+        """Test cleanfigure with a fill_between plot."""
+        line_difference = 36
+        x = np.linspace(1, 100, 20)
+        y = np.linspace(1, 100, 20)
+
+        with plt.rc_context(rc=RC_PARAMS):
+            fig, ax = plt.subplots(1, 1, figsize=(5, 5))
+            ax.fill_between(x, y, y + 10)
+            raw = get_tikz_code()
+
+            clean_figure(fig)
+            clean = get_tikz_code()
+
+            # Use number of lines to test if it worked.
+            # both boundaries should be reduced to their first and last point
+            num_lines_raw = raw.count("\n")
+            num_lines_clean = clean.count("\n")
+            assert num_lines_raw - num_lines_clean == line_difference
+            assert "fill between [of=fillbetween0a and fillbetween0b]" in clean
+        plt.close("all")
+
+    def test_line_collection(self) -> None:
+        """Test cleanfigure with a line collection."""
+        num_visible_segments = 2
+        x = np.linspace(0, 10, 100)
+        segments = [np.column_stack([x, x + offset]) for offset in (0, 1)]
+        # The last segment lies outside of the axes
+        segments.append(np.column_stack([x + 20, x]))
+        with plt.rc_context(rc=RC_PARAMS):
+            fig, ax = plt.subplots(1, 1, figsize=(5, 5))
+            collection = LineCollection(segments, colors=["r", "g", "b"])
+            ax.add_collection(collection)
+            ax.set_xlim(0, 10)
+            ax.set_ylim(0, 10)
+
+            clean_figure(fig)
+
+            # The straight lines are reduced to their end points, but the colors still
+            # belong to the same segments.
+            assert [len(segment) for segment in collection.get_segments()] == [2, 2, 0]
+            clean = get_tikz_code()
+            assert clean.count("\\path [draw=") == num_visible_segments
+        plt.close("all")
+
+    @pytest.mark.parametrize("filled", [False, True])
+    def test_contour(self, *, filled: bool) -> None:
+        """Test cleanfigure with line and filled contours."""
+        x = np.linspace(-3, 3, 200)
+        xx, yy = np.meshgrid(x, x)
+        zz = np.exp(-(xx**2) - yy**2)
+        with plt.rc_context(rc=RC_PARAMS):
+            fig, ax = plt.subplots(1, 1, figsize=(5, 5))
+            contour = ax.contourf if filled else ax.contour
+            contour_set = contour(xx, yy, zz, levels=[0.1, 0.5, 0.9])
+            # Only the left half of the rings is visible
+            ax.set_xlim(-3, 0)
+            paths = contour_set.get_paths()
+
+            clean_figure(fig)
+
+            clean_paths = contour_set.get_paths()
+            assert len(clean_paths) == len(paths)
+            for path, clean_path in zip(paths, clean_paths, strict=True):
+                assert 0 < len(clean_path.vertices) < len(path.vertices)
+            # Contour lines are cut open at the axes, filled regions stay closed.
+            assert (Path.CLOSEPOLY in clean_paths[0].codes) == filled
+        plt.close("all")
+
     def test_bar(self) -> None:
         """Test if clean_figure runs (with warning)."""
         x = np.linspace(1, 100, 20)
@@ -172,7 +271,7 @@ class TestPlottypes:
         plt.close("all")
 
     def test_wireframe3d(self) -> None:
-        """Test if clean_figure runs (with warning)."""
+        """Test if clean_figure runs."""
         # Grab some test data.
         x, y, z = axes3d.get_test_data(0.05)
 
@@ -182,14 +281,11 @@ class TestPlottypes:
 
             # Plot a basic wireframe.
             ax.plot_wireframe(x, y, z, rstride=10, cstride=10)
-            with pytest.warns(
-                Warning, match=r"Cleaning Line Collections \(scatter plot\) is not supported yet."
-            ):
-                clean_figure(fig)
+            clean_figure(fig)
         plt.close("all")
 
     def test_surface3d(self) -> None:
-        """Test if clean_figure runs (with warning)."""
+        """Test if clean_figure runs."""
         # Make data.
         x = np.arange(-5, 5, 0.25)
         y = np.arange(-5, 5, 0.25)
@@ -214,21 +310,38 @@ class TestPlottypes:
             # Add a color bar which maps values to colors.
             fig.colorbar(surf, shrink=0.5, aspect=5)
 
-            with pytest.warns(UserWarning) as record:  # noqa: PT030  (we check later for specific warnings)
-                clean_figure(fig)
+            clean_figure(fig)
 
-            warnings = (
-                "Cleaning Poly3DCollections is not supported yet.",
-                "Cleaning Line Collections (scatter plot) is not supported yet.",
+        plt.close("all")
+
+    @pytest.mark.parametrize(
+        ("target_resolution", "limits"), [(20, (-5, 5)), (600, (0, 5))], ids=["merge", "prune"]
+    )
+    def test_surface3d_decimation(
+        self, target_resolution: int, limits: tuple[float, float]
+    ) -> None:
+        """Test that small faces are merged and that faces outside of the view are removed."""
+        x = np.linspace(-5, 5, 200)
+        xx, yy = np.meshgrid(x, x)
+        with plt.rc_context(rc=RC_PARAMS):
+            fig = plt.figure()
+            ax: axes3d.Axes3D = fig.add_subplot(111, projection="3d")
+            surf = ax.plot_surface(
+                xx, yy, np.sin(np.hypot(xx, yy)), rstride=1, cstride=1, cmap="coolwarm"
             )
-            assert len(record) == len(warnings)
-            for record_warning, warning in zip(record, warnings, strict=True):
-                assert str(record_warning.message) == warning
+            ax.set_xlim(*limits)
+            ax.set_ylim(*limits)
+            num_faces = len(surf.get_array())
 
+            clean_figure(fig, target_resolution=target_resolution)
+
+            fig.canvas.draw()
+            assert len(surf.get_paths()) < num_faces / 2
+            assert len(surf.get_facecolor()) == len(surf.get_paths())
         plt.close("all")
 
     def test_trisurface3d(self) -> None:
-        """Test if clean_figure runs (with warning)."""
+        """Test if clean_figure runs."""
         n_radii = 8
         n_angles = 36
         # Make radii and angles spaces (radius r=0 omitted to eliminate duplication).
@@ -252,8 +365,7 @@ class TestPlottypes:
             ax: axes3d.Axes3D = plt.axes(projection="3d")
 
             ax.plot_trisurf(x, y, z, linewidth=0.2, antialiased=True)
-            with pytest.warns(Warning, match="Cleaning Poly3DCollections is not supported yet."):
-                clean_figure(fig)
+            clean_figure(fig)
         plt.close("all")
 
     def test_contour3d(self) -> None:
@@ -264,12 +376,12 @@ class TestPlottypes:
             x, y, z = axes3d.get_test_data(0.05)
             cset = ax.contour(x, y, z, cmap=plt.get_cmap("coolwarm"))
             ax.clabel(cset, fontsize=9, inline=1)
-            with pytest.warns(Warning, match=r"Cleaning QuadContourSet is not supported yet."):
+            with pytest.warns(Warning, match=r"Cleaning 3D contour sets is not supported yet."):
                 clean_figure(fig)
         plt.close("all")
 
     def test_polygon3d(self) -> None:
-        """Test if clean_figure runs (with warning)."""
+        """Test if clean_figure runs."""
         with plt.rc_context(rc=RC_PARAMS):
             fig = plt.figure()
             ax: axes3d.Axes3D = plt.axes(projection="3d")
@@ -296,8 +408,7 @@ class TestPlottypes:
             ax.set_ylim3d(-1, 4)
             ax.set_zlabel("Z")
             ax.set_zlim3d(0, 1)
-            with pytest.warns(Warning, match="Cleaning Poly3DCollections is not supported yet."):
-                clean_figure(fig)
+            clean_figure(fig)
         plt.close("all")
 
     def test_bar3d(self) -> None:
@@ -327,7 +438,7 @@ class TestPlottypes:
         plt.close("all")
 
     def test_quiver3d(self) -> None:
-        """Test if clean_figure runs (with warning)."""
+        """Test if clean_figure runs."""
         with plt.rc_context(rc=RC_PARAMS):
             fig = plt.figure()
             ax = plt.axes(projection="3d")
@@ -345,10 +456,7 @@ class TestPlottypes:
             w = np.sqrt(2.0 / 3.0) * np.cos(np.pi * x) * np.cos(np.pi * y) * np.sin(np.pi * z)
 
             ax.quiver(x, y, z, u, v, w, length=0.1, normalize=True)
-            with pytest.warns(
-                Warning, match=r"Cleaning Line Collections \(scatter plot\) is not supported yet."
-            ):
-                clean_figure(fig)
+            clean_figure(fig)
         plt.close("all")
 
 
@@ -675,3 +783,200 @@ def test_memory() -> None:
     plt.plot(np.arange(100000))
     clean_figure()
     plt.close("all")
+
+
+def opheim_simplify_loop(x: np.ndarray, y: np.ndarray, tol: float) -> np.ndarray:
+    """Vertex-by-vertex implementation of the Opheim algorithm, as reference."""
+    mask = np.zeros_like(x) == 1
+    mask[0] = True
+    mask[-1] = True
+    n = np.size(x)
+    i = 0
+    while i <= n - 2 - 1:
+        j = i + 1
+        v = np.array([x[j] - x[i], y[j] - y[i]])
+        while j < n - 1 and np.linalg.norm(v) <= tol:
+            j = j + 1
+            v = np.array([x[j] - x[i], y[j] - y[i]])
+        v = v / np.linalg.norm(v)
+        normal = np.array([v[1], -v[0]])
+        while j < n - 1:
+            v1 = np.array([x[j + 1] - x[i], y[j + 1] - y[i]])
+            if np.abs(np.dot(normal, v1)) > tol:
+                break
+            v2 = np.array([x[j + 1] - x[j], y[j + 1] - y[i]])
+            if np.dot(v, v2) <= 0:
+                break
+            j = j + 1
+        i = j
+        mask[i] = True
+    return mask
+
+
+@pytest.mark.parametrize("tol", [1e-3, 0.05, 0.5, 2.0])
+def test_opheim_simplify(tol: float) -> None:
+    rng = np.random.default_rng(0)
+    lines = [
+        (np.array([1.0, 2, 2, 2, 3]), np.array([1.0, 1, 2, 1, 1])),
+        (np.array([0.0, 1e-4, 0]), np.array([0.0, 0, 0])),
+        (np.cumsum(rng.random(500)), np.cumsum(rng.normal(size=500))),
+        (np.linspace(0, 10, 2000), np.sin(np.linspace(0, 10, 2000))),
+        (rng.integers(0, 5, 300).astype(float), rng.integers(0, 5, 300).astype(float)),
+    ]
+    for x, y in lines:
+        np.testing.assert_array_equal(_opheim_simplify(x, y, tol), opheim_simplify_loop(x, y, tol))
+
+
+def _plot_for_overlay() -> plt.Figure:
+    fig = plt.figure()
+    x = np.linspace(1, 100, 200)
+    ax = fig.add_subplot(1, 3, 1)
+    ax.plot(x, np.sin(x / 10))
+    ax.scatter(x, np.cos(x / 10))
+    ax.set_xlim([20, 80])
+    ax = fig.add_subplot(1, 3, 2)
+    ax.fill_between(x, np.sin(x / 10), np.sin(x / 10) + 1)
+    ax = fig.add_subplot(1, 3, 3, projection="3d")
+    ax.plot(np.sin(x / 10), np.cos(x / 10), x / 100)
+    return fig
+
+
+def test_overlay() -> None:
+    with plt.rc_context(rc=RC_PARAMS):
+        fig = _plot_for_overlay()
+        raw = get_tikz_code(fig)
+        overlay = clean_figure(fig, inplace=False)
+        # The figure itself is left untouched.
+        assert get_tikz_code(fig) == raw
+        assert overlay is not None
+        assert len(overlay) == 4  # noqa: PLR2004
+        line = fig.axes[0].get_lines()[0]
+        assert len(overlay[line]) < len(line.get_xdata())
+        overlay_code = get_tikz_code(fig, overlay=overlay)
+
+        fig_inplace = _plot_for_overlay()
+        assert clean_figure(fig_inplace) is None
+        assert overlay_code == get_tikz_code(fig_inplace)
+    plt.close("all")
+
+
+def test_zoom() -> None:
+    """Test that lines to data far outside of the axes are cut off at an enlarged box."""
+    with plt.rc_context(rc=RC_PARAMS):
+        fig, ax = plt.subplots(1, 1, figsize=(5, 5))
+        (line,) = ax.plot([0, 50, 52, 100, 100, 0], [0, 50, 51, 100, 10, 90])
+        ax.set_xlim(40, 60)
+        ax.set_ylim(40, 60)
+
+        clean_figure(fig, target_resolution=0)
+
+        # The box is enlarged by 10% of the axes range on each side, i.e., to [38, 62]. The
+        # last segment passes through the box, so it keeps both crossings.
+        expected = [
+            [38.0, 38.0],
+            [50.0, 50.0],
+            [52.0, 51.0],
+            [62.0, 61.208333],
+            [np.nan, np.nan],
+            [62.0, 40.4],
+            [38.0, 59.6],
+        ]
+        np.testing.assert_allclose(line.get_xydata(), expected, rtol=1e-6)
+    plt.close("all")
+
+
+@pytest.mark.parametrize("n", [10, 100_000])
+def test_pixelate(n: int) -> None:
+    """Test that only one point per pixel cell is kept, in addition to the end points and NaNs."""
+    rng = np.random.default_rng(42)
+    x = rng.random(n)
+    y = rng.random(n)
+    x[n // 2] = np.nan
+
+    mask = _pixelate(x, y, 100.0, 100.0)
+
+    assert mask[0]
+    assert mask[-1]
+    assert mask[n // 2]
+    # The pixel grid has twice the resolution
+    cells = np.round(np.stack([x, y], axis=1) * 200.0)
+    is_finite = np.isfinite(x)
+    kept = cells[mask & is_finite]
+    # Every cell keeps exactly one point, apart from the cells of the first and last point
+    inner = cells[1:-1][mask[1:-1] & is_finite[1:-1]]
+    assert len(np.unique(inner, axis=0)) == len(inner)
+    assert len(np.unique(kept, axis=0)) == len(np.unique(cells[is_finite], axis=0))
+
+
+def _plot_many_artists() -> plt.Figure:
+    fig = plt.figure()
+    x = np.linspace(1, 10, 2000)
+    for i in range(3):
+        ax = fig.add_subplot(2, 2, i + 1)
+        # Several artists share the axes, whose limits are only autoscaled when they are read
+        for k in range(4):
+            ax.plot(x, np.sin(x * (i + k + 1)) + k)
+        ax.scatter(x[::10], np.cos(x[::10]))
+        ax.add_collection(LineCollection([np.stack([x, np.cos(x * (i + 1))], axis=1)]))
+        ax.contour(*np.meshgrid(x[::200], x[::200]), np.outer(np.sin(x[::200]), x[::200]))
+        if i == 1:
+            ax.set_xscale("log")
+    # A noisy line that is long enough to be simplified in the process pool
+    rng = np.random.default_rng(0)
+    ax.plot(np.linspace(1, 10, 2**15), np.cumsum(rng.normal(size=2**15)) / 100)
+    ax3d = fig.add_subplot(2, 2, 4, projection="3d")
+    for k in range(4):
+        ax3d.plot(np.cos(x * (k + 1)), np.sin(x), x)
+    return fig
+
+
+def test_workers() -> None:
+    """Test that cleaning on thread and process pools gives the same result as cleaning serially."""
+    fig = _plot_many_artists()
+    clean_figure(fig)
+    serial = get_tikz_code(fig)
+    plt.close(fig)
+
+    # Races between the threads would only show up in some of the runs
+    for _ in range(5):
+        fig = _plot_many_artists()
+        clean_figure(fig, workers=8)
+        threaded = get_tikz_code(fig)
+        plt.close(fig)
+
+        assert threaded == serial
+
+
+def test_workers_invalid() -> None:
+    """Test that at least one worker is required."""
+    fig, ax = plt.subplots()
+    ax.plot([0, 1], [0, 1])
+    with pytest.raises(ValueError, match="at least 1"):
+        clean_figure(fig, workers=0)
+    plt.close(fig)
+
+
+def _plot_random_walk(style: str) -> Line2D:
+    rng = np.random.default_rng(42)
+    n = 5000
+    x = np.linspace(1, 100, n)
+    y = np.cumsum(rng.normal(size=n))
+    y[rng.integers(0, n, 20)] = np.nan
+    fig, ax = plt.subplots()
+    (line,) = ax.plot(x, y, style)
+    ax.set_xscale("log")
+    ax.set_xlim(5, 60)
+    ax.set_ylim(np.nanmin(y) / 3, np.nanmax(y) / 3)
+    clean_figure(fig)
+    plt.close(fig)
+    return line
+
+
+@pytest.mark.parametrize("style", ["-", "o", "-o"])
+def test_stream_line(style: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that streaming a line window by window gives the same result as cleaning it at once."""
+    at_once = _plot_random_walk(style).get_xydata()
+    monkeypatch.setattr("matplot2tikz._cleanfigure._STREAM_CHUNK_SIZE", 97)
+    streamed = _plot_random_walk(style).get_xydata()
+
+    np.testing.assert_array_equal(streamed, at_once)
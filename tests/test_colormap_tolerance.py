@@ -0,0 +1,22 @@
+"""Test writing colormaps with a reduced number of control points."""
+
+import matplotlib as mpl
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.figure import Figure
+
+from .helpers import assert_equality
+
+mpl.use("Agg")
+
+
+def plot() -> Figure:
+    fig, ax = plt.subplots()
+    x = np.linspace(0, 1, 5)
+    sc = ax.scatter(x, x, c=x, cmap="plasma")
+    fig.colorbar(sc, ax=ax)
+    return fig
+
+
+def test() -> None:
+    assert_equality(plot, __file__[:-3] + "_reference.tex", colormap_tolerance=0.01)
@@ -0,0 +1,83 @@
+"""Test that artists which are not visible in the figure are skipped."""
+
+import logging
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+from matplotlib.patches import Polygon
+
+import matplot2tikz
+
+from .helpers import assert_equality
+
+mpl.use("Agg")
+
+
+def plot() -> Figure:
+    fig, ax = plt.subplots()
+    x = np.linspace(0, 1, 5)
+    ax.plot(x, x, label="shown")
+    for i in range(3):
+        ax.plot(x, x + i, visible=False)
+    ax.plot(x, 2 * x, alpha=0)
+    ax.plot([], [])
+    ax.plot(x + 5, x)
+    ax.scatter([7, 8], [0.5, 0.5])
+    ax.add_patch(Polygon([(0.2, 0.2), (0.3, 0.2), (0.3, 0.3)], facecolor="none", edgecolor="none"))
+    ax.add_patch(Polygon([(0.5, 0.5), (0.7, 0.5), (0.7, 0.7)], clip_on=False))
+    ax.add_patch(Polygon([(3, 3), (4, 3), (4, 4)]))
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    ax.legend()
+    return fig
+
+
+def test() -> None:
+    assert_equality(plot, "test_cull_reference.tex")
+
+
+def test_show_info(caplog: pytest.LogCaptureFixture) -> None:
+    fig = plot()
+    with caplog.at_level(logging.INFO):
+        matplot2tikz.get_tikz_code(fig, show_info=True)
+    plt.close(fig)
+    # The empty artists include the title texts of the axes
+    assert "Skipped 12 artists" in caplog.text
+    assert "empty: 4" in caplog.text
+    assert "invisible: 3" in caplog.text
+    assert "out of view: 3" in caplog.text
+    assert "transparent: 2" in caplog.text
+
+
+@pytest.mark.parametrize("hide_first_bin", [False, True])
+def test_histogram_first_bin(*, hide_first_bin: bool) -> None:
+    """Test that a hidden bin is left out of a histogram, which is then drawn bin by bin."""
+    fig, ax = plt.subplots()
+    _, _, patches = ax.hist([0.5, 0.5, 0.5, 1.5, 2.5, 2.7], bins=[0, 1, 2, 3], label="histogram")
+    patches[0].set_visible(not hide_first_bin)
+    code = matplot2tikz.get_tikz_code(fig)
+    plt.close(fig)
+
+    if hide_first_bin:
+        assert "ybar interval" not in code
+        assert "(axis cs:0,0) rectangle (axis cs:1,3)" not in code
+        assert "(axis cs:2,0) rectangle (axis cs:3,2)" in code
+    else:
+        assert "ybar interval" in code
+        assert "0 3" in code
+
+
+def test_hidden_histogram() -> None:
+    """Test that a histogram with all bins hidden is culled."""
+    fig, ax = plt.subplots()
+    _, _, patches = ax.hist([0.5, 1.5, 2.5], bins=[0, 1, 2, 3], label="histogram")
+    for patch in patches:
+        patch.set_visible(False)
+    code = matplot2tikz.get_tikz_code(fig)
+    plt.close(fig)
+
+    assert "ybar interval" not in code
+    assert "rectangle" not in code
@@ -0,0 +1,23 @@
+"""Test that custom colormaps are defined once and referred to by name."""
+
+import matplotlib as mpl
+from matplotlib import pyplot as plt
+from matplotlib.colors import ListedColormap
+from matplotlib.figure import Figure
+
+from .helpers import assert_equality
+
+mpl.use("Agg")
+
+
+def plot() -> Figure:
+    fig, axes = plt.subplots(1, 3)
+    cmap = ListedColormap([[1, 0, 0], [0, 0.5, 0], [0, 0, 1]], name="traffic")
+    for k, (ax, ax_cmap) in enumerate(zip(axes, [cmap, cmap, "jet"], strict=True)):
+        sc = ax.scatter([0, 1, 2], [k, k + 1, k], c=[0, 1, 2], cmap=ax_cmap)
+        fig.colorbar(sc, ax=ax, orientation="horizontal")
+    return fig
+
+
+def test() -> None:
+    assert_equality(plot, __file__[:-3] + "_reference.tex")
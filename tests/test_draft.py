@@ -0,0 +1,34 @@
+"""Test the draft mode, which trades fidelity for speed."""
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+
+import matplot2tikz
+
+from .helpers import assert_equality
+
+mpl.use("Agg")
+
+
+def plot() -> Figure:
+    fig, ax = plt.subplots(figsize=(2, 1.5))
+    x = np.linspace(0, 2 * np.pi, 5000)
+    ax.plot(x, np.sin(x), label="sin")
+    ax.scatter([1, 2, 3], [0.5, 0.0, -0.5], marker="s", label="points")
+    ax.set_xticks([0, np.pi, 2 * np.pi], ["0", "pi", "2pi"])
+    ax.legend(loc="best")
+    return fig
+
+
+def test() -> None:
+    assert_equality(plot, "test_draft_reference.tex", mode="draft")
+
+
+def test_unknown_mode() -> None:
+    fig = plot()
+    with pytest.raises(ValueError, match="Unsupported mode"):
+        matplot2tikz.get_tikz_code(fig, mode="fast")
+    plt.close(fig)
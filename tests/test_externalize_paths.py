@@ -0,0 +1,25 @@
+"""Test externalization of polygon paths."""
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.patches import Polygon
+
+from .helpers import assert_equality
+
+mpl.use("Agg")
+
+
+def plot() -> Figure:
+    fig, ax = plt.subplots()
+    t = np.linspace(0.0, 2 * np.pi, 8, endpoint=False)
+    ax.add_patch(Polygon(np.column_stack([np.cos(t), np.sin(t)]), facecolor="C0", edgecolor="k"))
+    ax.add_patch(Polygon([[1.5, -1.0], [2.0, 1.0]], closed=False, edgecolor="C1"))
+    ax.set_xlim(-1.5, 2.5)
+    ax.set_ylim(-1.5, 1.5)
+    return fig
+
+
+def test() -> None:
+    assert_equality(plot, "test_externalize_paths_reference.tex", externalize_tables=True)
@@ -0,0 +1,32 @@
+"""Test that the fast tick mode gives the same output as the default one."""
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
+
+import matplot2tikz
+
+mpl.use("Agg")
+
+
+def plot() -> Figure:
+    fig, axes = plt.subplots(2, 2)
+    x = np.linspace(1, 100, 50)
+    axes[0, 0].plot(x, np.sin(x))
+    axes[0, 0].tick_params(direction="inout")
+    axes[0, 1].loglog(x, x**2)
+    axes[1, 0].bar(["a", "b", "c"], [1, 3, 2])
+    axes[1, 0].xaxis.tick_top()
+    axes[1, 1].plot(x, x)
+    axes[1, 1].set_xticks([20, 50, 80], ["low", "mid", "high"], rotation=45)
+    axes[1, 1].minorticks_on()
+    return fig
+
+
+def test() -> None:
+    fig = plot()
+    code = matplot2tikz.get_tikz_code(fig, include_disclaimer=False)
+    fast_code = matplot2tikz.get_tikz_code(fig, include_disclaimer=False, fast_ticks=True)
+    plt.close(fig)
+    assert fast_code == code
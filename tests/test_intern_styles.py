@@ -0,0 +1,23 @@
+"""Test interning of repeated plot options into styles."""
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
+
+from .helpers import assert_equality
+
+mpl.use("Agg")
+
+
+def plot() -> Figure:
+    fig, ax = plt.subplots()
+    x = np.linspace(0, 1, 3)
+    for k in range(4):
+        ax.plot(x, x + k, color=f"C{k % 2}", marker="o" if k % 2 else None, label=f"line {k}")
+    ax.legend()
+    return fig
+
+
+def test() -> None:
+    assert_equality(plot, __file__[:-3] + "_reference.tex", intern_styles=True)
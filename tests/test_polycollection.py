@@ -0,0 +1,116 @@
+"""Test grouping of equally styled polygons in a PolyCollection."""
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+
+from matplot2tikz import get_tikz_code
+
+from .helpers import assert_equality
+
+mpl.use("Agg")
+
+
+def plot() -> Figure:
+    fig, ax = plt.subplots()
+    triangles = [
+        [[0, 0], [1, 0], [0, 1]],
+        [[1, 1], [1, 0], [0, 1]],  # Clockwise, overlapping with the first one
+        [[2, 0], [3, 0], [2, 1]],
+        [[2, 1], [3, 1], [3, 2]],
+    ]
+    ax.add_collection(
+        PolyCollection(triangles, facecolors=["C0", "C0", "C1", "C0"], edgecolors="none")
+    )
+    ax.set_xlim(0, 3)
+    ax.set_ylim(0, 2)
+    return fig
+
+
+def test() -> None:
+    assert_equality(plot, "test_polycollection_reference.tex")
+
+
+def test_translucent_overlap() -> None:
+    """Test that overlapping translucent polygons are not joined, such that overlaps blend."""
+    fig, ax = plt.subplots()
+    squares = [
+        [[0, 0], [2, 0], [2, 2], [0, 2]],
+        [[1, 1], [3, 1], [3, 3], [1, 3]],
+        [[4, 0], [5, 0], [5, 1], [4, 1]],
+    ]
+    ax.add_collection(PolyCollection(squares, facecolors="C0", alpha=0.5))
+    code = get_tikz_code(fig)
+    plt.close(fig)
+
+    assert code.count("\\path [") == len(squares)
+
+
+def test_translucent_disjoint() -> None:
+    """Test that translucent polygons are still joined if they do not overlap."""
+    fig, ax = plt.subplots()
+    squares = [
+        [[0, 0], [1, 0], [1, 1], [0, 1]],
+        [[1, 0], [2, 0], [2, 1], [1, 1]],
+        [[0, 1], [1, 1], [1, 2], [0, 2]],
+    ]
+    ax.add_collection(PolyCollection(squares, facecolors="C0", alpha=0.5))
+    code = get_tikz_code(fig)
+    plt.close(fig)
+
+    assert code.count("\\path [") == 1
+
+
+def test_legend_of_first_patch() -> None:
+    """Test that the legend shows the style of the first patch."""
+    fig, ax = plt.subplots()
+    triangles = [[[0, 0], [1, 0], [0, 1]], [[2, 0], [3, 0], [2, 1]]]
+    ax.add_collection(
+        PolyCollection(triangles, facecolors=["C0", "C1"], edgecolors="k", label="triangles")
+    )
+    ax.legend()
+    code = get_tikz_code(fig)
+    plt.close(fig)
+
+    assert "\\addlegendimage{area legend, draw=black, fill=steelblue31119180}" in code
+
+
+def test_empty() -> None:
+    """Test that a collection without any drawable path is exported without error."""
+    fig, ax = plt.subplots()
+    ax.add_collection(PolyCollection([np.empty((0, 2))], label="empty"))
+    ax.legend()
+    code = get_tikz_code(fig)
+    plt.close(fig)
+
+    assert "\\addlegendentry{empty}" in code
+
+
+def test_stroked_overlap() -> None:
+    """Test that overlapping stroked patches are not joined, such that upper ones hide edges."""
+    fig, ax = plt.subplots()
+    squares = [
+        [[0, 0], [2, 0], [2, 2], [0, 2]],
+        [[1, 1], [3, 1], [3, 3], [1, 3]],
+    ]
+    ax.add_collection(PolyCollection(squares, facecolors="C0", edgecolors="k"))
+    code = get_tikz_code(fig)
+    plt.close(fig)
+
+    assert code.count("\\path [draw=black") == len(squares)
+
+
+def test_unstroked_overlap() -> None:
+    """Test that overlapping opaque patches without edges are still joined."""
+    fig, ax = plt.subplots()
+    squares = [
+        [[0, 0], [2, 0], [2, 2], [0, 2]],
+        [[1, 1], [3, 1], [3, 3], [1, 3]],
+    ]
+    ax.add_collection(PolyCollection(squares, facecolors="C0", edgecolors="none"))
+    code = get_tikz_code(fig)
+    plt.close(fig)
+
+    assert code.count("\\path [") == 1